@@ -0,0 +1,135 @@
+"""
+推文过滤规则
+RSS 扫描器与 Playwright 抓取器共用，导入时编译一次
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 不可用时逐个关键词查找
+    ahocorasick = None
+
+# 短链接通常是推广，也是最常见的命中，单独判断
+SHORT_LINK_RE = re.compile(r'https?://t\.co/\S+', re.IGNORECASE)
+
+# 其余垃圾广告/推广规则
+SPAM_PATTERNS = (
+    r'(?:DM|dm|私信).*?(?:获取|get|领取)',
+    r'(?:免费|free).*?(?:赠送|领取|加微信)',
+    r'(?:掃碼|扫码|点击链接)',
+    r'(?:代币|token).*?(?:发行|launch|发射)',
+    r'(?:空投|airdrop).*?(?:领取|claim)',
+)
+
+# 网页抓取内容额外过滤
+WEB_SPAM_PATTERNS = SPAM_PATTERNS + (
+    r'(?:加微信|wechat|微信)',
+    r'(?:邀请码|referral).*?(?:免费|free)',
+)
+
+# 转发: 前缀均为字面量 (小写比较，等价于不区分大小写)
+RT_PREFIXES = ('rt @', '转发自')
+WEB_RT_PREFIXES = RT_PREFIXES + ('mt @',)
+# ⚠️ 与其后同一行内的"转发"，仅在文本含 ⚠️ 时才用到
+WARNING_RT_RE = re.compile(r'⚠️.*?转发')
+
+
+def _compile(patterns):
+    """合并为一个分支正则，每条推文只扫描一遍"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+def search_batch(regex, texts) -> list:
+    """整批文本只扫描一遍，返回每条是否命中
+    以换行拼接: 垃圾广告规则不含锚点，且 . 不跨越换行，命中不会跨条；
+    转发判断依赖文本开头，不能这样合并
+    """
+    hits = [False] * len(texts)
+    if not texts:
+        return hits
+    # 第 i 条占 [ends[i-1], ends[i])，含其后的分隔符
+    ends = list(accumulate(len(t) + 1 for t in texts))
+    for m in regex.finditer('\n'.join(texts)):
+        hits[bisect_right(ends, m.start())] = True
+    return hits
+
+
+SPAM_RE = _compile(SPAM_PATTERNS)
+WEB_SPAM_RE = _compile(WEB_SPAM_PATTERNS)
+
+
+def has_short_link(text: str) -> bool:
+    """t.co 短链接: 不含 :// 的文本不可能命中，直接跳过正则"""
+    return '://' in text and SHORT_LINK_RE.search(text) is not None
+
+
+def is_spam(text: str, regex) -> bool:
+    """单条垃圾广告判断: 先查短链接，再走其余规则的合并正则"""
+    return has_short_link(text) or regex.search(text) is not None
+
+
+def flag_spam(regex, texts) -> list:
+    """整批垃圾广告标记: 短链接逐条判断，其余规则只对未命中的推文合并扫描一遍"""
+    hits = [has_short_link(t) for t in texts]
+    rest = [i for i, hit in enumerate(hits) if not hit]
+    for i, hit in zip(rest, search_batch(regex, [texts[i] for i in rest])):
+        hits[i] = hit
+    return hits
+
+
+def is_retweet(content: str, prefixes: tuple, anchored: bool = False) -> bool:
+    """转发判断: 先比前缀，绝大多数推文不进入正则
+    anchored 为 True 时 ⚠️ 规则也要求位于开头 (网页抓取)，否则可出现在任意位置 (RSS)
+    """
+    if content[:4].lower().startswith(prefixes):
+        return True
+    if anchored:
+        return content.startswith('⚠️') and WARNING_RT_RE.match(content) is not None
+    return '⚠️' in content and WARNING_RT_RE.search(content) is not None
+
+
+@lru_cache(maxsize=256)
+def _keyword_automaton(keywords: tuple):
+    """关键词 Aho-Corasick 自动机 (按关键词列表缓存)，值为 (序号, 长度)"""
+    automaton = ahocorasick.Automaton()
+    for i, kw in enumerate(keywords):
+        if kw not in automaton:  # 重复关键词保留靠前的序号
+            automaton.add_word(kw, (i, len(kw)))
+    automaton.make_automaton()
+    return automaton
+
+
+def lower_keywords(keywords) -> tuple:
+    """关键词统一转小写 (加载配置时做一次)"""
+    return tuple(k.lower() for k in keywords)
+
+
+def find_keyword(text_lower: str, keywords: tuple) -> int:
+    """按关键词顺序取第一个在文本中出现的关键词，返回其首次出现的位置，都未出现返回 -1
+    text_lower 与 keywords 均需已转小写
+    """
+    if '' in keywords:
+        # 空关键词同 str.find 在位置 0 命中，只需再看排在它之前的关键词 (自动机不能添加空词)
+        pos = find_keyword(text_lower, keywords[:keywords.index('')])
+        return pos if pos >= 0 else 0
+    if not keywords:
+        return -1
+    if ahocorasick is None:
+        for kw in keywords:
+            idx = text_lower.find(kw)
+            if idx >= 0:
+                return idx
+        return -1
+
+    # 单次扫描文本；同一关键词最先报告的即首次出现
+    best, pos = len(keywords), -1
+    for end, (i, n) in _keyword_automaton(keywords).iter(text_lower):
+        if i < best:
+            best, pos = i, end - n + 1
+            if i == 0:
+                break
+    return pos
@@ -0,0 +1,112 @@
+"""
+回测热点内核
+numba 可用时 JIT 编译并缓存到磁盘 (cache=True)，否则以纯 Python 运行。
+稳定内核可用 build_aot.py 预编译为 strategy_kernels 扩展模块。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 未安装: 退化为原函数
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+# 注: 输入含指标预热期的 NaN，fastmath 会假设无 NaN 而改变比较结果，故不启用
+
+@njit(cache=True)
+def rsi_loop(rsi, oversold, exit_level):
+    """RSI 超卖策略状态机，返回 (k, 2) 的 [入场索引, 出场索引]，未平仓以最后一根出场"""
+    n = len(rsi)
+    trades = np.empty((n, 2), dtype=np.int64)
+    k = 0
+    holding = False
+    for i in range(1, n):
+        if not holding:
+            if rsi[i] < oversold:
+                trades[k, 0] = i
+                holding = True
+        elif rsi[i] > exit_level:
+            trades[k, 1] = i
+            k += 1
+            holding = False
+    if holding:
+        trades[k, 1] = n - 1
+        k += 1
+    return trades[:k]
+
+
+@njit(cache=True)
+def ma_cross_loop(close, fast, slow, fee):
+    """均线交叉策略逐笔收益 (已扣双边手续费)，期末未平仓的交易记为 NaN"""
+    n = len(close)
+    returns = np.empty(n)
+    k = 0
+    entry = 0.0
+    holding = False
+    for i in range(1, n):
+        if not holding:
+            if fast[i - 1] <= slow[i - 1] and fast[i] > slow[i]:
+                entry = close[i]
+                holding = True
+        elif fast[i - 1] >= slow[i - 1] and fast[i] < slow[i]:
+            returns[k] = close[i] / entry - 1 - 2 * fee
+            k += 1
+            holding = False
+    if holding:
+        returns[k] = np.nan
+        k += 1
+    return returns[:k]
+
+
+@njit(cache=True)
+def wilder_rsi(close, period):
+    """Wilder 平滑 RSI: 前 period 个涨跌取简单均值作种子，之后递推，预热期为 NaN"""
+    n = len(close)
+    rsi = np.full(n, np.nan)
+    if n <= period:
+        return rsi
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            avg_gain += d
+        else:
+            avg_loss -= d
+    avg_gain /= period
+    avg_loss /= period
+    rsi[period] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        avg_gain = (avg_gain * (period - 1) + (d if d > 0 else 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + (-d if d < 0 else 0.0)) / period
+        rsi[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return rsi
+
+
+@njit(cache=True)
+def bbands(close, window, k):
+    """布林带单次遍历，返回 (n, 4) 的 [中轨, 标准差(ddof=1), 上轨, 下轨]"""
+    n = len(close)
+    out = np.full((n, 4), np.nan)
+    s = 0.0
+    s2 = 0.0
+    for i in range(n):
+        s += close[i]
+        s2 += close[i] * close[i]
+        if i >= window:
+            s -= close[i - window]
+            s2 -= close[i - window] * close[i - window]
+        if i >= window - 1:
+            mean = s / window
+            var = (s2 - s * mean) / (window - 1)
+            std = np.sqrt(var) if var > 0 else 0.0
+            out[i, 0] = mean
+            out[i, 1] = std
+            out[i, 2] = mean + k * std
+            out[i, 3] = mean - k * std
+    return out
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+预编译回测内核 (AOT)
+生成 strategy_kernels 扩展模块，避免每个进程启动时的 JIT 编译开销
+用法: python build_aot.py
+"""
+
+import os
+
+from numba.pycc import CC
+
+import _kernels
+
+cc = CC('strategy_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('rsi_loop', 'i8[:, :](f8[:], f8, f8)')(_kernels.rsi_loop.py_func)
+cc.export('ma_cross_loop', 'f8[:](f8[:], f8[:], f8[:], f8)')(_kernels.ma_cross_loop.py_func)
+cc.export('wilder_rsi', 'f8[:](f8[:], i8)')(_kernels.wilder_rsi.py_func)
+cc.export('bbands', 'f8[:, :](f8[:], i8, f8)')(_kernels.bbands.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"已生成 strategy_kernels -> {cc.output_dir}")
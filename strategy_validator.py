@@ -8,28 +8,46 @@ import os
 from pathlib import Path
 import sys
 import json
+import atexit
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import re
+import weakref
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from dotenv import load_dotenv
 import ccxt
 import pandas as pd
 import numpy as np
 
+try:
+    # AOT 预编译内核 (python build_aot.py)
+    from strategy_kernels import rsi_loop
+except ImportError:
+    from _kernels import rsi_loop
+
 # 加载配置
 load_dotenv()
 
-# 配置日志
+# 配置日志: 记录先入队列，由后台线程写文件，验证流程不阻塞在磁盘 I/O 上
+_log_queue = queue.Queue(-1)
+_queue_handler = QueueHandler(_log_queue)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
+    handlers=[_queue_handler]
+)
+# 调用方 (如 scheduler) 已先配置日志时 basicConfig 不生效，队列无人写入，不启动后台线程
+if _queue_handler in logging.getLogger().handlers:
+    _log_listener = QueueListener(
+        _log_queue,
         logging.FileHandler(Path(__file__).parent / 'logs' / 'validator.log'),
         logging.StreamHandler()
-    ]
-)
+    )
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 logger = logging.getLogger('strategy_validator')
 
 @dataclass
@@ -199,112 +217,108 @@ class BacktestEngine:
     def __init__(self):
         self.initial_capital = float(os.getenv('INITIAL_CAPITAL', 10000))
         self.fee_rate = 0.001  # 0.1% 手续费
+        
+        # 策略类型 -> 回测函数
+        self.dispatch = {
+            'ma_crossover': self.run_ma_crossover,
+            'rsi_oversold': self.run_rsi_strategy,
+            'rsi_overbought': self.run_rsi_strategy,
+        }
+        # 策略类型 -> 所需指标
+        self.indicator_deps = {
+            'ma_crossover': {'ma'},
+            'rsi_oversold': {'rsi'},
+            'rsi_overbought': {'rsi'},
+        }
+        # (id(df), 指标集合, 参数) -> 已添加指标的 DataFrame，随源 df 释放而清除
+        self._indicator_cache: Dict[tuple, pd.DataFrame] = {}
     
-    def add_indicators(self, df: pd.DataFrame, strategy_type: str, params: Dict) -> pd.DataFrame:
-        """添加技术指标"""
-        df = df.copy()
+    def required_indicators(self, strategy_type: str) -> Set[str]:
+        """策略类型所需的指标 (未知类型回退到MA交叉)"""
+        return self.indicator_deps.get(strategy_type, {'ma'})
+    
+    def add_indicators(self, df: pd.DataFrame, indicators: Set[str], params: Dict) -> pd.DataFrame:
+        """添加技术指标 (indicators: 'ma' / 'rsi')"""
+        key = (id(df), frozenset(indicators), tuple(sorted(params.items())))
+        cached = self._indicator_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        out = df.copy()
         
         # 移动平均线
-        if 'ma' in strategy_type:
+        if 'ma' in indicators:
             period = params.get('slow_ma', 20)
-            df['ma_slow'] = df['close'].rolling(window=period).mean()
-            df['ma_fast'] = df['close'].rolling(window=10).mean()
+            out['ma_slow'] = out['close'].rolling(window=period).mean()
+            out['ma_fast'] = out['close'].rolling(window=10).mean()
         
         # RSI
-        if 'rsi' in strategy_type:
-            delta = df['close'].diff()
+        if 'rsi' in indicators:
+            delta = out['close'].diff()
             gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
             loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
             rs = gain / loss
-            df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # 布林带
-        if 'bollinger' in strategy_type:
-            df['bb_middle'] = df['close'].rolling(window=20).mean()
-            df['bb_std'] = df['close'].rolling(window=20).std()
-            df['bb_upper'] = df['bb_middle'] + 2 * df['bb_std']
-            df['bb_lower'] = df['bb_middle'] - 2 * df['bb_std']
+            out['rsi'] = 100 - (100 / (1 + rs))
         
-        return df
+        # 源 df 释放后 id 可能被复用，届时清除对应缓存
+        self._indicator_cache[key] = out
+        weakref.finalize(df, self._indicator_cache.pop, key, None)
+        return out
     
     def run_ma_crossover(self, df: pd.DataFrame, params: Dict) -> Tuple[List, List]:
         """MA交叉策略回测"""
-        trades = []
-        position = None
-        
-        for i in range(1, len(df)):
-            row = df.iloc[i]
-            prev_row = df.iloc[i-1]
-            
-            # 买入信号：快线突破慢线
-            if position is None:
-                if prev_row['ma_fast'] <= prev_row['ma_slow'] and row['ma_fast'] > row['ma_slow']:
-                    position = {
-                        'entry_price': row['close'],
-                        'entry_time': row.name,
-                        'size': self.initial_capital / row['close']
-                    }
-                    trades.append({
-                        'type': 'long',
-                        'entry_price': row['close'],
-                        'entry_time': row.name,
-                        'exit_price': None,
-                        'exit_time': None
-                    })
-            
-            # 卖出信号：快线下穿慢线
-            else:
-                if prev_row['ma_fast'] >= prev_row['ma_slow'] and row['ma_fast'] < row['ma_slow']:
-                    position['exit_price'] = row['close']
-                    position['exit_time'] = row.name
-                    trades[-1]['exit_price'] = row['close']
-                    position['exit_time'] = row.name
-                    position = None
-        
-        # 平仓未结束的持仓
-        if position:
-            trades[-1]['exit_price'] = df.iloc[-1]['close']
-            trades[-1]['exit_time'] = df.iloc[-1].name
+        close = df['close'].to_numpy()
+        fast = df['ma_fast'].to_numpy()
+        slow = df['ma_slow'].to_numpy()
+        ts = df.index
+        
+        # 用布尔运算一次求出全部金叉/死叉，循环中不再有数据相关分支
+        cross_up = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:])
+        cross_down = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:])
+        entry_idx = np.flatnonzero(cross_up) + 1
+        exit_idx = np.flatnonzero(cross_down) + 1
+        
+        # 每个入场配对其后第一个死叉；持仓期间的重复金叉共享同一出场，只保留第一个
+        nxt = np.searchsorted(exit_idx, entry_idx, side='right')
+        keep = np.ones(len(nxt), dtype=bool)
+        keep[1:] = nxt[1:] != nxt[:-1]
+        entry_idx = entry_idx[keep]
+        
+        # 平仓未结束的持仓：无死叉的入场以最后一根K线出场
+        exit_idx = np.append(exit_idx, len(df) - 1)[nxt[keep]]
+        
+        trades = [
+            {
+                'type': 'long',
+                'entry_price': close[e],
+                'entry_time': ts[e],
+                'exit_price': close[x],
+                'exit_time': ts[x]
+            }
+            for e, x in zip(entry_idx, exit_idx)
+        ]
         
         return trades, df
     
     def run_rsi_strategy(self, df: pd.DataFrame, params: Dict) -> Tuple[List, pd.DataFrame]:
         """RSI策略回测"""
         oversold = params.get('rsi_oversold', 30)
-        trades = []
-        position = None
-        
-        for i in range(1, len(df)):
-            row = df.iloc[i]
-            
-            # 买入信号：RSI低于超卖线
-            if position is None:
-                if row['rsi'] < oversold:
-                    position = {
-                        'entry_price': row['close'],
-                        'entry_time': row.name
-                    }
-                    trades.append({
-                        'type': 'long',
-                        'entry_price': row['close'],
-                        'entry_time': row.name,
-                        'exit_price': None,
-                        'exit_time': None
-                    })
-            
-            # 卖出信号：RSI回到50以上
-            else:
-                if row['rsi'] > 50:
-                    position['exit_price'] = row['close']
-                    position['exit_time'] = row.name
-                    trades[-1]['exit_price'] = row['close']
-                    trades[-1]['exit_time'] = row.name
-                    position = None
-        
-        # 平仓未结束的持仓
-        if position and trades:
-            trades[-1]['exit_price'] = df.iloc[-1]['close']
-            trades[-1]['exit_time'] = df.iloc[-1].name
+        close = df['close'].to_numpy()
+        ts = df.index
+        
+        # 买入信号：RSI低于超卖线；卖出信号：RSI回到50以上；未结束的持仓以最后一根K线平仓
+        pairs = rsi_loop(df['rsi'].to_numpy(dtype=np.float64), float(oversold), 50.0)
+        
+        trades = [
+            {
+                'type': 'long',
+                'entry_price': close[e],
+                'entry_time': ts[e],
+                'exit_price': close[x],
+                'exit_time': ts[x]
+            }
+            for e, x in pairs
+        ]
         
         return trades, df
     
@@ -414,8 +428,9 @@ class StrategyValidator:
         self.min_trades = int(os.getenv('MIN_TRADES', 100))
         self.min_win_rate = float(os.getenv('MIN_WIN_RATE', 0.55))
     
-    def validate(self, strategy_id: int) -> Dict:
-        """验证指定策略"""
+    def validate(self, strategy_id: int, df: Optional[pd.DataFrame] = None,
+                 indicators: Optional[Set[str]] = None) -> Dict:
+        """验证指定策略 (df/indicators 由批量验证传入以共享行情和指标)"""
         # 读取策略
         with open(self.strategies_file, 'r') as f:
             data = json.load(f)
@@ -438,23 +453,24 @@ class StrategyValidator:
         logger.info(f"解析结果: {parsed}")
         
         # 获取市场数据
-        df = self.data_fetcher.fetch_ohlcv()
+        if df is None:
+            df = self.data_fetcher.fetch_ohlcv()
         if df.empty:
             logger.error("无法获取市场数据")
             return None
         
         # 添加指标
-        df = self.backtest_engine.add_indicators(df, parsed['type'], parsed['parameters'])
+        if indicators is None:
+            indicators = self.backtest_engine.required_indicators(parsed['type'])
+        df = self.backtest_engine.add_indicators(df, indicators, parsed['parameters'])
         
         # 执行回测
-        if parsed['type'] == 'ma_crossover':
-            trades, df = self.backtest_engine.run_ma_crossover(df, parsed['parameters'])
-        elif 'rsi' in parsed['type']:
-            trades, df = self.backtest_engine.run_rsi_strategy(df, parsed['parameters'])
-        else:
+        runner = self.backtest_engine.dispatch.get(parsed['type'])
+        if runner is None:
             # 默认使用MA策略
             logger.warning(f"未知策略类型 {parsed['type']}，使用MA交叉策略")
-            trades, df = self.backtest_engine.run_ma_crossover(df, parsed.get('parameters', {}))
+            runner = self.backtest_engine.run_ma_crossover
+        trades, df = runner(df, parsed.get('parameters', {}))
         
         # 计算指标
         result = self.backtest_engine.calculate_metrics(trades, df)
@@ -516,12 +532,23 @@ class StrategyValidator:
         with open(self.strategies_file, 'r') as f:
             data = json.load(f)
         
+        # 只验证技术分析策略，跳过基本面策略
+        pending = [s for s in data['strategies'] if s['status'] == 'pending_ta']
+        
+        # 所有策略共享同一份行情，指标取并集，相同参数的策略复用指标缓存
+        df = None
+        indicators = set()
+        if pending:
+            df = self.data_fetcher.fetch_ohlcv()
+            for s in pending:
+                parsed_type = self.parser.parse(s['extracted_logic'])['type']
+                indicators |= self.backtest_engine.required_indicators(parsed_type)
+        
         results = []
         for strategy in data['strategies']:
-            # 只验证技术分析策略，跳过基本面策略
             if strategy['status'] == 'pending_ta':
                 print(f"验证策略: {strategy['title']}")
-                result = self.validate(strategy['id'])
+                result = self.validate(strategy['id'], df=df, indicators=indicators)
                 if result:
                     results.append({
                         'id': strategy['id'],
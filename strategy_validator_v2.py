@@ -8,18 +8,47 @@
 
 import os
 import sys
+import re
 import json
 import logging
 import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from dotenv import load_dotenv
-import ccxt
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxtpro
 import pandas as pd
 import numpy as np
 from scipy import stats
 
+try:
+    # AOT 预编译内核 (python build_aot.py)
+    from strategy_kernels import bbands, ma_cross_loop, wilder_rsi
+except ImportError:
+    from _kernels import bbands, ma_cross_loop, wilder_rsi
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 不可用时回退到预编译正则
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:  # ijson 不可用时整体读入再解析
+    ijson = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 预热: 导入时完成 JIT 编译 (或读取磁盘缓存)，首个回测不承担编译耗时
+ma_cross_loop(np.zeros(2), np.zeros(2), np.zeros(2), 0.0)
+
 load_dotenv()
 
 logging.basicConfig(
@@ -32,6 +61,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger('validator_v2')
 
+# 日线K线磁盘缓存
+CACHE_DIR = Path(__file__).parent / 'cache'
+OHLCV_CACHE_TTL = 3600  # 秒
+
 
 @dataclass
 class ValidationResult:
@@ -82,16 +115,45 @@ class StrategyClassifier:
     FUNDAMENTAL_KEYWORDS = ['pe', 'roe', 'dividend', '现金流', '基本面',
                            '估值', 'financial', 'ratio']
 
+    # 类型优先级: 高频 > 趋势 > 基本面
+    _LABELS = ('hf', 'trend', 'fundamental')
+
+    # 每类关键词预编译为一个正则，对文本只扫描一遍
+    _HF_RE = re.compile('|'.join(map(re.escape, HF_KEYWORDS)))
+    _TREND_RE = re.compile('|'.join(map(re.escape, TREND_KEYWORDS)))
+    _FUNDAMENTAL_RE = re.compile('|'.join(map(re.escape, FUNDAMENTAL_KEYWORDS)))
+
+    # 全部关键词建一个 Aho-Corasick 自动机 (导入时构建一次)，值为类型优先级
+    if ahocorasick is not None:
+        _AUTOMATON = ahocorasick.Automaton()
+        for _rank, _keywords in enumerate((HF_KEYWORDS, TREND_KEYWORDS, FUNDAMENTAL_KEYWORDS)):
+            for _kw in _keywords:
+                _AUTOMATON.add_word(_kw, _rank)
+        _AUTOMATON.make_automaton()
+        del _rank, _keywords, _kw
+    else:
+        _AUTOMATON = None
+
     @classmethod
     def classify(cls, logic_text: str) -> str:
         """根据策略描述判断类型"""
         text_lower = logic_text.lower()
 
-        if any(kw in text_lower for kw in cls.HF_KEYWORDS):
+        if cls._AUTOMATON is not None:
+            # 单次线性扫描，取命中的最高优先级；命中高频即可提前结束
+            best = None
+            for _, rank in cls._AUTOMATON.iter(text_lower):
+                if rank == 0:
+                    return 'hf'
+                if best is None or rank < best:
+                    best = rank
+            return cls._LABELS[best] if best is not None else 'trend'
+
+        if cls._HF_RE.search(text_lower):
             return 'hf'  # 高频/复杂
-        elif any(kw in text_lower for kw in cls.TREND_KEYWORDS):
+        elif cls._TREND_RE.search(text_lower):
             return 'trend'  # 趋势策略
-        elif any(kw in text_lower for kw in cls.FUNDAMENTAL_KEYWORDS):
+        elif cls._FUNDAMENTAL_RE.search(text_lower):
             return 'fundamental'  # 基本面
         else:
             return 'trend'  # 默认趋势
@@ -100,10 +162,11 @@ class StrategyClassifier:
 class ShortBacktestValidator:
     """短期回测验证器 (100-200交易日)"""
 
-    def __init__(self, symbol='BTC/USDT'):
+    def __init__(self, symbol='BTC/USDT', exchange: Optional[ccxt_async.Exchange] = None):
         self.symbol = symbol
-        # 使用现货API，避免期货API问题
-        self.exchange = ccxt.binance({
+        # 未注入时自建连接: 使用现货API，避免期货API问题；异步客户端，请求期间不阻塞事件循环
+        self._owns_exchange = exchange is None
+        self.exchange = exchange or ccxt_async.binance({
             'enableRateLimit': True,
             'options': {
                 'defaultType': 'spot',
@@ -112,154 +175,212 @@ class ShortBacktestValidator:
         self.initial_capital = 10000
         self.fee_rate = 0.001
 
+    def _cache_path(self) -> Path:
+        return CACHE_DIR / f"ohlcv_{self.symbol.replace('/', '')}_1d.parquet"
+
     async def fetch_data(self, days: int = 200) -> pd.DataFrame:
-        """获取K线数据"""
-        since = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-        ohlcv = self.exchange.fetch_ohlcv(self.symbol, '1d', since=since, limit=days)
+        """获取K线数据 (parquet 磁盘缓存: 1小时内直接复用，过期后只增量拉取)"""
+        cache_path = self._cache_path()
+        cached = None
+        if cache_path.exists():
+            try:
+                cached = pd.read_parquet(cache_path)
+            except Exception as e:  # pyarrow 未安装或文件损坏
+                logger.warning(f"读取K线缓存失败: {e}")
+            if cached is not None and (len(cached) < days
+                                       or time.time() - cached.index[-1].timestamp() >= days * 86400):
+                cached = None  # 缓存历史不够长，或最后一根已落后 days 天以上 (增量拉不到今天)，整段重新获取
+            elif cached is not None and time.time() - cache_path.stat().st_mtime < OHLCV_CACHE_TTL:
+                return cached.iloc[-days:]
+
+        if cached is not None:
+            # 从最后一根缓存K线 (可能尚未收盘) 开始增量获取
+            since = int(cached.index[-1].timestamp() * 1000)
+        else:
+            since = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
+        ohlcv = await self.exchange.fetch_ohlcv(self.symbol, '1d', since=since, limit=days)
 
         df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
-        return df
+        if cached is not None:
+            df = pd.concat([cached[cached.index < df.index[0]], df]) if len(df) else cached
+
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            df.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            logger.warning(f"写入K线缓存失败: {e}")
+        return df.iloc[-days:]
+
+    async def close(self):
+        """关闭自建的交易所连接 (异步客户端绑定在事件循环上，需在同一循环内关闭)"""
+        if self._owns_exchange:
+            await self.exchange.close()
 
     def add_indicators(self, df: pd.DataFrame, strategy_type: str, params: Dict) -> pd.DataFrame:
-        """添加技术指标"""
-        df = df.copy()
+        """添加技术指标 (指标列一次性拼接为新 DataFrame，不修改共享的K线 df)"""
+        close = df['close'].to_numpy(dtype=np.float64)
+        cols = {}
 
         if 'ma' in strategy_type:
+            # 各周期共用一次累加和: sma = (cs[w:] - cs[:-w]) / w
+            cs = np.concatenate(([0.0], np.cumsum(close)))
             for period in [10, 20, 50, 200]:
-                df[f'ma_{period}'] = df['close'].rolling(window=period).mean()
+                sma = np.full(len(close), np.nan)
+                if len(close) >= period:
+                    sma[period - 1:] = (cs[period:] - cs[:-period]) / period
+                cols[f'ma_{period}'] = sma
 
         if 'rsi' in strategy_type:
-            delta = df['close'].diff()
-            gain = delta.where(delta > 0, 0).rolling(14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-            df['rsi'] = 100 - (100 / (1 + gain / loss))
+            cols['rsi'] = wilder_rsi(close, 14)
 
         if 'bollinger' in strategy_type:
-            df['bb_middle'] = df['close'].rolling(20).mean()
-            df['bb_std'] = df['close'].rolling(20).std()
-            df['bb_upper'] = df['bb_middle'] + 2 * df['bb_std']
-            df['bb_lower'] = df['bb_middle'] - 2 * df['bb_std']
+            bands = bbands(close, 20, 2.0)
+            for i, name in enumerate(('bb_middle', 'bb_std', 'bb_upper', 'bb_lower')):
+                cols[name] = bands[:, i]
 
-        return df
+        if not cols:
+            return df
+        return pd.concat([df, pd.DataFrame(cols, index=df.index)], axis=1)
 
     async def run_backtest(self, df: pd.DataFrame, strategy_type: str) -> Dict:
-        """运行回测"""
-        trades = []
-        position = None
-
-        for i in range(1, len(df)):
-            row = df.iloc[i]
-
-            # 简单MA交叉策略
-            if 'ma' in strategy_type and 'crossover' in strategy_type:
-                if position is None:
-                    if df.iloc[i-1]['ma_50'] <= df.iloc[i-1]['ma_200'] and row['ma_50'] > row['ma_200']:
-                        position = {'entry': row['close']}
-                        trades.append({'entry': row['close'], 'exit': None})
-                else:
-                    if df.iloc[i-1]['ma_50'] >= df.iloc[i-1]['ma_200'] and row['ma_50'] < row['ma_200']:
-                        position = None
-                        trades[-1]['exit'] = row['close']
-                        trades[-1]['type'] = 'long'
-
-        # 计算收益
-        trade_returns = []
-        total_return = 0
-        wins = 0
-        for t in trades:
-            if t['exit']:
-                ret = (t['exit'] - t['entry']) / t['entry']
-                trade_returns.append(ret)
-                total_return += ret
-                if ret > 0:
-                    wins += 1
-
-        win_rate = wins / len(trades) if trades else 0
-
-        # 计算夏普比率 (简化版)
-        benchmark_return = (df['close'].iloc[-1] / df['close'].iloc[0]) - 1
-        if trade_returns:
-            avg_ret = np.mean(trade_returns)
-            std_ret = np.std(trade_returns, ddof=1) if len(trade_returns) > 1 else 0.001
+        """运行回测，trade_returns 为已平仓交易的逐笔收益数组 (已扣手续费)"""
+        close = df['close'].to_numpy(dtype=np.float64)
+        trade_count = 0
+        trade_returns = np.empty(0)
+
+        # 简单MA交叉策略: 逐笔收益由编译内核计算，期末未平仓记为 NaN
+        if 'ma' in strategy_type and 'crossover' in strategy_type:
+            returns = ma_cross_loop(close, df['ma_50'].to_numpy(dtype=np.float64),
+                                    df['ma_200'].to_numpy(dtype=np.float64), self.fee_rate)
+            trade_count = len(returns)
+            trade_returns = returns[~np.isnan(returns)]
+
+        # 全部指标在逐笔收益数组上一次算出
+        total_return = trade_returns.sum()
+        win_rate = np.count_nonzero(trade_returns > 0) / trade_count if trade_count else 0
+        benchmark_return = (close[-1] / close[0]) - 1
+        avg_return = trade_returns.mean() if len(trade_returns) else 0
+
+        # 年化夏普比率 (简化版，假设日交易)
+        sharpe = 0
+        if len(trade_returns) > 1:
+            std_ret = trade_returns.std(ddof=1)
             if std_ret > 0:
-                # 年化夏普比率 (假设日交易)
-                sharpe = (avg_ret / std_ret) * np.sqrt(252) if len(trade_returns) > 1 else 0
-            else:
-                sharpe = 0
-            avg_return = avg_ret
-        else:
-            sharpe = 0
-            avg_return = 0
+                sharpe = (avg_return / std_ret) * np.sqrt(252)
 
         return {
             'total_return': total_return,
             'win_rate': win_rate,
-            'trade_count': len(trades),
+            'trade_count': trade_count,
             'benchmark_return': benchmark_return,
             'sharpe_ratio': sharpe,
-            'avg_return': avg_return
+            'avg_return': avg_return,
+            'trade_returns': trade_returns
         }
 
 
 class RealTimeMonitor:
     """实时监控器 - 适合高频策略"""
 
-    def __init__(self, symbol='BTC/USDT'):
+    # 每次采样记录的字段，按列存放在预分配的 float64 数组中 (timestamp 为 epoch 秒，缺失为 NaN)
+    SAMPLE_FIELDS = ('timestamp', 'price', 'bid', 'ask', 'spread', 'bid_volume', 'ask_volume')
+
+    def __init__(self, symbol='BTC/USDT', exchange: Optional[ccxtpro.Exchange] = None):
         self.symbol = symbol
-        self.exchange = ccxt.binance({
+        # WebSocket 推送 (ccxt.pro)，无需轮询；未注入时自建连接
+        self._owns_exchange = exchange is None
+        self.exchange = exchange or ccxtpro.binance({
             'enableRateLimit': True,
             'options': {'defaultType': 'spot'}
         })
         self.signals = []
-        self.prices = []
         self.running = False
+        self._n = 0
+        self._window = 10  # 动量信号均价窗口
+        self._rolling_sum = 0.0  # 最近 _window 个价格之和，随采样 O(1) 更新
+        self._alloc_samples(0)
+
+    def _alloc_samples(self, capacity: int):
+        """(重新) 分配采样缓冲区，保留已有的前 _n 个样本"""
+        old = getattr(self, '_samples', {})
+        self._samples = {}
+        for f in self.SAMPLE_FIELDS:
+            buf = np.empty(capacity, dtype=np.float64)
+            if f in old:
+                buf[:self._n] = old[f][:self._n]
+            self._samples[f] = buf
+
+    def _record(self, **values: float):
+        """追加一条采样，容量不足时翻倍扩容"""
+        capacity = len(self._samples['price'])
+        if self._n == capacity:
+            self._alloc_samples(max(capacity * 2, 64))
+        for f in self.SAMPLE_FIELDS:
+            self._samples[f][self._n] = values[f]
+
+        prices = self._samples['price']
+        self._rolling_sum += prices[self._n]
+        if self._n >= self._window:
+            self._rolling_sum -= prices[self._n - self._window]
+        self._n += 1
+        if not np.isfinite(self._rolling_sum):
+            # 窗口内出现过 NaN 价格时增量和会一直为 NaN，按窗口重算
+            self._rolling_sum = prices[max(self._n - self._window, 0):self._n].sum()
 
     async def start(self, duration_hours: int = 24):
         """启动监控"""
         self.running = True
         self.start_time = datetime.now()
+        # 按每分钟一个样本预分配，推送更频繁时由 _record 翻倍扩容
+        self._n = 0
+        self._rolling_sum = 0.0
+        self._alloc_samples(int(duration_hours * 60) + 16)
 
-        while self.running and (datetime.now() - self.start_time).total_seconds() < duration_hours * 3600:
-            try:
-                # 获取订单簿数据
-                orderbook = self.exchange.fetch_order_book(self.symbol)
-                ticker = self.exchange.fetch_ticker(self.symbol)
-
-                self.prices.append({
-                    'timestamp': datetime.now(),
-                    'price': ticker['last'],
-                    'bid': orderbook['bids'][0][0] if orderbook['bids'] else None,
-                    'ask': orderbook['asks'][0][0] if orderbook['asks'] else None,
-                    'spread': orderbook['asks'][0][0] - orderbook['bids'][0][0] if orderbook['bids'] and orderbook['asks'] else None,
-                    'bid_volume': sum(b[1] for b in orderbook['bids'][:5]),
-                    'ask_volume': sum(a[1] for a in orderbook['asks'][:5]),
-                })
-
-                # 生成简单信号示例
-                if len(self.prices) > 2:
-                    signal = self._generate_signal()
-                    if signal:
-                        self.signals.append({
-                            **signal,
-                            'timestamp': datetime.now()
-                        })
-
-                await asyncio.sleep(60)  # 每分钟记录一次
-
-            except Exception as e:
-                logger.error(f"监控错误: {e}")
-                await asyncio.sleep(5)
+        try:
+            while self.running and (datetime.now() - self.start_time).total_seconds() < duration_hours * 3600:
+                try:
+                    # 订单簿与行情经同一 WebSocket 连接推送，await 到下一次更新为止
+                    orderbook, ticker = await asyncio.gather(
+                        self.exchange.watch_order_book(self.symbol),
+                        self.exchange.watch_ticker(self.symbol),
+                    )
+
+                    bids, asks = orderbook['bids'], orderbook['asks']
+                    self._record(
+                        timestamp=datetime.now().timestamp(),
+                        price=ticker['last'],
+                        bid=bids[0][0] if bids else np.nan,
+                        ask=asks[0][0] if asks else np.nan,
+                        spread=asks[0][0] - bids[0][0] if bids and asks else np.nan,
+                        bid_volume=sum(b[1] for b in bids[:5]),
+                        ask_volume=sum(a[1] for a in asks[:5]),
+                    )
+
+                    # 生成简单信号示例
+                    if self._n > 2:
+                        signal = self._generate_signal()
+                        if signal:
+                            self.signals.append({
+                                **signal,
+                                'timestamp': datetime.now()
+                            })
+
+                except Exception as e:
+                    logger.error(f"监控错误: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            if self._owns_exchange:
+                await self.exchange.close()
 
     def _generate_signal(self) -> Optional[Dict]:
         """生成信号示例"""
-        if len(self.prices) < 10:
+        if self._n < self._window:
             return None
 
-        recent = self.prices[-10:]
-        avg_price = np.mean([p['price'] for p in recent])
-        current = self.prices[-1]['price']
+        avg_price = self._rolling_sum / self._window
+        current = float(self._samples['price'][self._n - 1])
 
         # 简单动量信号
         if current > avg_price * 1.01:
@@ -278,7 +399,7 @@ class RealTimeMonitor:
         return {
             'signal_count': len(self.signals),
             'monitoring_period_hours': (datetime.now() - self.start_time).total_seconds() / 3600 if self.running else 0,
-            'price_samples': len(self.prices)
+            'price_samples': self._n
         }
 
 
@@ -286,18 +407,26 @@ class StatisticalValidator:
     """统计显著性检验器 (纯numpy实现)"""
 
     def __init__(self):
-        self.signals = []
-        self.returns = []
+        # 信号按列存储: 收益为预分配数组 (满了翻倍)，类型/时间为并行列表
+        self._returns = np.empty(1024, dtype=np.float64)
+        self._n = 0
+        self.signal_types: List[str] = []
+        self.signal_times: List[datetime] = []
+
+    @property
+    def returns(self) -> np.ndarray:
+        """已记录信号的收益 (视图，不复制)"""
+        return self._returns[:self._n]
 
     def add_signal(self, signal_type: str, entry_price: float, exit_price: float, timestamp: datetime):
         """添加信号记录"""
         ret = (exit_price - entry_price) / entry_price if entry_price else 0
-        self.signals.append({
-            'type': signal_type,
-            'return': ret,
-            'timestamp': timestamp
-        })
-        self.returns.append(ret)
+        if self._n == len(self._returns):
+            self._returns = np.resize(self._returns, len(self._returns) * 2)
+        self._returns[self._n] = ret
+        self._n += 1
+        self.signal_types.append(signal_type)
+        self.signal_times.append(timestamp)
 
     def _t_test_1samp(self, data: List[float], popmean: float) -> tuple:
         """单样本t检验 (numpy实现)"""
@@ -315,13 +444,13 @@ class StatisticalValidator:
         t_stat = (mean - popmean) / se
 
         # 简化p值计算 (双尾)
-        p_value = 2 * (1 - stats.t.cdf(abs(t_stat), n - 1)) if 'stats' in dir() else 0.05
+        p_value = 2 * stats.t.sf(abs(t_stat), n - 1)
 
         return t_stat, p_value
 
     def test_significance(self) -> Dict:
         """检验信号显著性 (t-test vs 随机)"""
-        n = len(self.returns)
+        n = self._n
         if n < 30:
             return {
                 't_statistic': 0,
@@ -334,8 +463,9 @@ class StatisticalValidator:
                 'note': '样本不足 (<30)'
             }
 
-        mean_ret = np.mean(self.returns)
-        std_ret = np.std(self.returns, ddof=1)
+        returns = self.returns
+        mean_ret = returns.mean()
+        std_ret = returns.std(ddof=1)
 
         # 计算t统计量
         se = std_ret / np.sqrt(n) if n > 1 else 0.001
@@ -346,7 +476,7 @@ class StatisticalValidator:
 
         # 简化p值 (z-score 转 p-value, 双尾)
         if abs(z_score) > 0:
-            p_value = 2 * (1 - stats.norm.cdf(abs(z_score)))
+            p_value = 2 * stats.norm.sf(abs(z_score))
         else:
             p_value = 1.0
 
@@ -387,11 +517,17 @@ class StrategyValidatorV2:
             os.path.dirname(__file__), 'strategies.json'
         )
         self.classifier = StrategyClassifier()
-        self.backtest_validator = ShortBacktestValidator()
-        self.monitor = RealTimeMonitor()
+        # 回测与监控共用一个交易所实例: 一个连接池、一个限速队列
+        self.exchange = self._new_exchange()
+        self.backtest_validator = ShortBacktestValidator(exchange=self.exchange)
+        self.monitor = RealTimeMonitor(exchange=self.exchange)
         self.stats_validator = StatisticalValidator()
+        # (symbol, timeframe, days) -> K线请求 Task，各趋势策略共享
+        self._ohlcv_cache: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        # (symbol, days, strategy_type) -> 回测 Task，同一批次内相同输入只回测一次
+        self._backtest_cache: Dict[Tuple[str, int, str], asyncio.Future] = {}
 
-    def validate_strategy(self, strategy: Dict) -> ValidationResult:
+    async def validate_strategy(self, strategy: Dict) -> ValidationResult:
         """验证单个策略"""
         logic = strategy.get('extracted_logic', strategy.get('content', ''))
         strategy_type = self.classifier.classify(logic)
@@ -407,7 +543,7 @@ class StrategyValidatorV2:
         if strategy_type == 'trend':
             # 趋势策略 -> 短期回测
             result.validation_method = "backtest"
-            result = self._validate_trend(strategy, result)
+            result = await self._validate_trend(strategy, result)
         elif strategy_type == 'hf':
             # 高频策略 -> 实时监控
             result.validation_method = "monitor"
@@ -418,59 +554,113 @@ class StrategyValidatorV2:
 
         return result
 
-    def _validate_trend(self, strategy: Dict, result: ValidationResult) -> ValidationResult:
+    async def _fetch_ohlcv(self, days: int) -> pd.DataFrame:
+        """获取K线 (同一 symbol/周期/天数只请求一次，并发的策略共享同一请求)"""
+        key = (self.backtest_validator.symbol, '1d', days)
+        task = self._ohlcv_cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.backtest_validator.fetch_data(days=days))
+            self._ohlcv_cache[key] = task
+        try:
+            return await task
+        except Exception:
+            # 失败的请求不缓存，下次重新获取
+            self._ohlcv_cache.pop(key, None)
+            raise
+
+    async def _run_backtest(self, days: int, strategy_type: str) -> Dict:
+        df = await self._fetch_ohlcv(days=days)
+        df = self.backtest_validator.add_indicators(df, strategy_type, {})
+        return await self.backtest_validator.run_backtest(df, strategy_type)
+
+    async def _backtest(self, days: int, strategy_type: str) -> Dict:
+        """回测 (并发的同类策略共享同一个回测 Task)"""
+        key = (self.backtest_validator.symbol, days, strategy_type)
+        task = self._backtest_cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_backtest(days, strategy_type))
+            self._backtest_cache[key] = task
+        try:
+            return await task
+        except Exception:
+            self._backtest_cache.pop(key, None)
+            raise
+
+    async def _validate_trend(self, strategy: Dict, result: ValidationResult) -> ValidationResult:
         """验证趋势策略"""
-        import asyncio
-
-        async def run():
-            df = await self.backtest_validator.fetch_data(days=200)
-            df = self.backtest_validator.add_indicators(df, result.strategy_type, {})
-
-            metrics = await self.backtest_validator.run_backtest(df, result.strategy_type)
-
-            result.backtest_return = metrics['total_return']
-            result.backtest_benchmark = metrics['benchmark_return']
-            result.backtest_win_rate = metrics['win_rate']
-            result.backtest_sharpe = metrics.get('sharpe_ratio', 0)
-            result.backtest_trades = metrics['trade_count']
-            result.backtest_avg_return = metrics.get('avg_return', 0)
-            result.backtest_max_drawdown = 0.1  # 简化
-
-            # 置信度评分
-            if metrics['trade_count'] > 0:
-                if metrics['total_return'] > metrics['benchmark_return']:
-                    result.confidence_score = 70 + metrics['win_rate'] * 20
-                else:
-                    result.confidence_score = 40 + metrics['win_rate'] * 10
+        metrics = await self._backtest(days=200, strategy_type=result.strategy_type)
+
+        result.backtest_return = metrics['total_return']
+        result.backtest_benchmark = metrics['benchmark_return']
+        result.backtest_win_rate = metrics['win_rate']
+        result.backtest_sharpe = metrics.get('sharpe_ratio', 0)
+        result.backtest_trades = metrics['trade_count']
+        result.backtest_avg_return = metrics.get('avg_return', 0)
+        result.backtest_max_drawdown = 0.1  # 简化
+
+        # 置信度评分
+        if metrics['trade_count'] > 0:
+            if metrics['total_return'] > metrics['benchmark_return']:
+                result.confidence_score = 70 + metrics['win_rate'] * 20
             else:
-                result.confidence_score = 30
-                result.notes = "无交易信号"
+                result.confidence_score = 40 + metrics['win_rate'] * 10
+        else:
+            result.confidence_score = 30
+            result.notes = "无交易信号"
 
-            return result
+        return result
 
-        # 同步调用
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def _validate_all_async(self, pending: List[Dict]) -> List[ValidationResult]:
+        """在同一事件循环内并发验证"""
         try:
-            result = loop.run_until_complete(run())
+            return list(await asyncio.gather(*(self.validate_strategy(s) for s in pending)))
         finally:
-            loop.close()
-
-        return result
+            # Task 绑定在本次事件循环上，不能跨 asyncio.run 复用
+            self._ohlcv_cache.clear()
+            self._backtest_cache.clear()
+            await self.close()
+
+    def _iter_pending(self):
+        """逐条读取待验证策略 (ijson 流式解析，内存占用不随文件增长)"""
+        with open(self.strategies_file, 'rb') as f:
+            if ijson is not None:
+                strategies = ijson.items(f, 'strategies.item', use_float=True)
+            else:
+                strategies = _json_loads(f.read())['strategies']
+            for s in strategies:
+                if s['status'].startswith('pending'):
+                    yield s
 
     def validate_all_pending(self) -> List[ValidationResult]:
         """验证所有待验证策略"""
-        with open(self.strategies_file, 'r') as f:
-            data = json.load(f)
+        pending = []
+        for strategy in self._iter_pending():
+            logger.info(f"验证策略: {strategy['title']}")
+            pending.append(strategy)
+
+        return asyncio.run(self._validate_all_async(pending))
 
-        results = []
-        for strategy in data['strategies']:
-            if strategy['status'].startswith('pending'):
-                logger.info(f"验证策略: {strategy['title']}")
-                result = self.validate_strategy(strategy)
-                results.append(result)
+    async def run_monitor(self, duration_hours: int = 24):
+        """运行实时监控，结束 (含被取消) 后关闭共享连接"""
+        try:
+            await self.monitor.start(duration_hours=duration_hours)
+        finally:
+            await self.close()
+
+    @staticmethod
+    def _new_exchange():
+        # 会话在首次请求时才创建并绑定到当时的事件循环
+        return ccxtpro.binance({
+            'enableRateLimit': True,
+            'options': {'defaultType': 'spot'}
+        })
 
-        return results
+    async def close(self):
+        """关闭共享的交易所连接，并换上未连接的新实例供下一次 asyncio.run 使用"""
+        await self.exchange.close()
+        self.exchange = self._new_exchange()
+        self.backtest_validator.exchange = self.exchange
+        self.monitor.exchange = self.exchange
 
     def print_result(self, result: ValidationResult):
         """打印完整验证结果"""
@@ -514,7 +704,10 @@ async def demo():
 
     # 测试K线获取
     print("测试K线获取...")
-    df = await validator.backtest_validator.fetch_data(days=30)
+    try:
+        df = await validator.backtest_validator.fetch_data(days=30)
+    finally:
+        await validator.close()
     print(f"获取 {len(df)} 条K线")
 
     # 测试短期回测
@@ -551,7 +744,7 @@ if __name__ == '__main__':
         validator = StrategyValidatorV2()
         print("启动实时监控 (按 Ctrl+C 停止)...")
         try:
-            asyncio.run(validator.monitor.start(duration_hours=24))
+            asyncio.run(validator.run_monitor(duration_hours=24))
         except KeyboardInterrupt:
             validator.monitor.stop()
             print("\n监控停止")
@@ -9,11 +9,26 @@ from pathlib import Path
 import sys
 import json
 import re
+from urllib.request import Request, urlopen
 import feedparser
+import xxhash
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml 不可用时回退到 feedparser + 正则
+    etree = None
+
+# HTML 标签 (lxml 不可用或解析失败时的回退清理)
+_TAG_RE = re.compile(r'<[^>]+>')
+# 从URL末段提取脚本ID
+_ID_RE = re.compile(r'/([a-zA-Z0-9-]+)/?$')
+_DC_CREATOR = '{http://purl.org/dc/elements/1.1/}creator'
+# 不解析外部实体、不联网
+_XML_PARSER = etree.XMLParser(resolve_entities=False, no_network=True) if etree is not None else None
+
 
 @dataclass
 class TradingViewStrategy:
@@ -27,30 +42,65 @@ class TradingViewStrategy:
     source: str = "tradingview"
 
 
+def _strip_html(summary: str) -> str:
+    """去除HTML标签，截断到500字符"""
+    if etree is not None and summary.strip():
+        try:
+            return lxml_html.fromstring(summary).text_content()[:500]
+        except (etree.ParserError, ValueError):
+            pass
+    return _TAG_RE.sub('', summary)[:500]
+
+
+def _iter_entries(feed_url: str):
+    """逐条产出 (title, link, author, published, summary)；RSS 用 lxml 解析，其他格式 (如 Atom) 交给 feedparser"""
+    source = feed_url
+    if etree is not None:
+        req = Request(feed_url, headers={'User-Agent': 'Mozilla/5.0 (strategy_miner)'})
+        with urlopen(req, timeout=30) as resp:
+            source = resp.read()
+        try:
+            items = etree.fromstring(source, _XML_PARSER).findall('.//item')
+        except etree.XMLSyntaxError:  # 格式不规范时交给 feedparser 宽松解析
+            items = []
+        if items:
+            for item in items:
+                yield (
+                    item.findtext('title') or 'Unknown',
+                    item.findtext('link') or '',
+                    item.findtext('author') or item.findtext(_DC_CREATOR) or 'Unknown',
+                    item.findtext('pubDate') or datetime.now().isoformat(),
+                    item.findtext('description') or '',
+                )
+            return
+
+    feed = feedparser.parse(source)
+    for entry in feed.entries:
+        yield (
+            entry.get('title', 'Unknown'),
+            entry.get('link', ''),
+            entry.get('author', 'Unknown'),
+            entry.get('published', datetime.now().isoformat()),
+            entry.get('summary', ''),
+        )
+
+
 def parse_tradingview_feed(feed_url: str) -> List[Dict]:
     """解析TradingView RSS feed"""
     strategies = []
 
     try:
-        feed = feedparser.parse(feed_url)
-
-        for entry in feed.entries:
-            # 提取信息
-            title = entry.get('title', 'Unknown')
-            url = entry.get('link', '')
-            author = entry.get('author', 'Unknown')
-            published = entry.get('published', datetime.now().isoformat())
-            summary = entry.get('summary', '')
-
+        for title, url, author, published, summary in _iter_entries(feed_url):
             # 清理HTML标签
-            description = re.sub(r'<[^>]+>', '', summary)[:500]
+            description = _strip_html(summary)
 
             # 生成ID
-            match = re.search(r'/([a-zA-Z0-9-]+)/?$', url)
+            match = _ID_RE.search(url)
             if match:
                 script_id = f"tv_{match.group(1)}"
             else:
-                script_id = f"tv_{hash(url) % 100000}"
+                # 进程无关、可复现的 64 位哈希
+                script_id = f"tv_{xxhash.xxh64_hexdigest(url.encode())}"
 
             strategies.append({
                 'id': script_id,
@@ -89,7 +139,10 @@ def discover_from_rss(max_feeds: int = 5) -> List[Dict]:
         all_strategies.extend(strategies)
         print(f"  -> {len(strategies)} 个策略")
 
-    return all_strategies
+    # 按URL去重 (集合中只存 8 字节哈希)
+    seen = set()
+    return [s for s in all_strategies
+            if (h := xxhash.xxh64_intdigest(s['url'].encode())) not in seen and not seen.add(h)]
 
 
 def main():
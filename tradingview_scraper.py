@@ -11,11 +11,22 @@ import json
 import re
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 import requests
-from bs4 import BeautifulSoup
+import xxhash
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:  # selectolax < 1.0 的 Modest 后端
+        from selectolax.parser import HTMLParser
+    except ImportError:  # selectolax 不可用时回退到 BeautifulSoup
+        HTMLParser = None
+        from bs4 import BeautifulSoup
 
 # 配置
 logging.basicConfig(
@@ -28,6 +39,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger('tradingview')
 
+# 预编译正则 (BeautifulSoup 回退路径的 class 匹配、数字/ID 提取)
+_CARD_RE = re.compile(r'tv-card|script-card', re.I)
+_AUTHOR_RE = re.compile(r'author|username', re.I)
+_DESC_RE = re.compile(r'description|summary', re.I)
+_DETAIL_DESC_RE = re.compile(r'description|about', re.I)
+_VIEW_RE = re.compile(r'view', re.I)
+_LIKE_RE = re.compile(r'like|recommend', re.I)
+_NUM_RE = re.compile(r'[\d,]+')
+_ID_RE = re.compile(r'/([a-zA-Z0-9-]+)/$')
+
 
 @dataclass
 class TradingViewStrategy:
@@ -56,15 +77,31 @@ class TradingViewScraper:
         'Accept-Language': 'en-US,en;q=0.5',
     }
 
+    # 并发抓取线程数 / 每秒最多发起的请求数 (礼貌限速)
+    MAX_WORKERS = 6
+    MAX_REQUESTS_PER_SECOND = 5
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update(self.HEADERS)
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _throttle(self):
+        """限速: 各线程的请求发起时间至少间隔 1/MAX_REQUESTS_PER_SECOND 秒"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + 1 / self.MAX_REQUESTS_PER_SECOND
+        if wait > 0:
+            time.sleep(wait)
 
     def fetch_scripts_page(self, page: int = 1) -> Optional[str]:
         """获取策略列表页面"""
         url = f"{self.SCRIPTS_URL}?sort=recently_published&page={page}"
 
         try:
+            self._throttle()
             logger.info(f"请求: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
@@ -73,21 +110,32 @@ class TradingViewScraper:
             logger.error(f"获取页面失败: {e}")
             return None
 
+    # selectolax CSS 选择器 (class 子串匹配、不区分大小写，与 bs4 回退路径的正则一致)
+    CARD_CSS = 'div[class*="tv-card" i], div[class*="script-card" i]'
+    AUTHOR_CSS = 'a[class*="author" i], a[class*="username" i]'
+    DESC_CSS = 'div[class*="description" i], div[class*="summary" i]'
+    VIEWS_CSS = 'span[class*="view" i]'
+    LIKES_CSS = 'span[class*="like" i], span[class*="recommend" i]'
+
     def parse_scripts_page(self, html: str) -> List[Dict]:
         """解析策略列表页面"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        strategies = []
-
         # 查找策略卡片 - TradingView页面结构
         # 注意：实际结构可能变化，需要根据实际页面调整
-        cards = soup.find_all('div', class_=re.compile(r'tv-card|script-card', re.I))
+        if HTMLParser is not None:
+            cards = HTMLParser(html).css(self.CARD_CSS)
+            parse_card = self._parse_card
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+            cards = soup.find_all('div', class_=_CARD_RE)
+            parse_card = self._parse_card_bs4
+
+        strategies = []
 
         logger.info(f"找到 {len(cards)} 个策略卡片")
 
         for card in cards:
             try:
-                strategy = self._parse_card(card)
+                strategy = parse_card(card)
                 if strategy:
                     strategies.append(strategy)
             except Exception as e:
@@ -97,81 +145,108 @@ class TradingViewScraper:
         return strategies
 
     def _parse_card(self, card) -> Optional[Dict]:
-        """解析单个策略卡片"""
+        """解析单个策略卡片 (selectolax 节点)"""
         # 提取链接和标题
-        link = card.find('a', href=True)
+        link = card.css_first('a[href]')
         if not link:
             return None
 
-        url = self.BASE_URL + link['href']
-        title = link.get_text(strip=True)
-
-        if not title or 'script' not in url.lower():
+        def text_of(css: str) -> Optional[str]:
+            elem = card.css_first(css)
+            return elem.text(strip=True) if elem else None
+
+        return self._build_strategy(
+            href=link.attributes['href'],
+            title=link.text(strip=True),
+            author=text_of(self.AUTHOR_CSS),
+            description=text_of(self.DESC_CSS),
+            views_text=text_of(self.VIEWS_CSS),
+            likes_text=text_of(self.LIKES_CSS),
+        )
+
+    def _parse_card_bs4(self, card) -> Optional[Dict]:
+        """解析单个策略卡片 (BeautifulSoup 回退)"""
+        link = card.find('a', href=True)
+        if not link:
             return None
 
-        # 提取作者
-        author_elem = card.find('a', class_=re.compile(r'author|username', re.I))
-        author = author_elem.get_text(strip=True) if author_elem else "Unknown"
+        def text_of(tag: str, pattern: re.Pattern) -> Optional[str]:
+            elem = card.find(tag, class_=pattern)
+            return elem.get_text(strip=True) if elem else None
 
-        # 提取描述
-        desc_elem = card.find('div', class_=re.compile(r'description|summary', re.I))
-        description = desc_elem.get_text(strip=True) if desc_elem else ""
+        return self._build_strategy(
+            href=link['href'],
+            title=link.get_text(strip=True),
+            author=text_of('a', _AUTHOR_RE),
+            description=text_of('div', _DESC_RE),
+            views_text=text_of('span', _VIEW_RE),
+            likes_text=text_of('span', _LIKE_RE),
+        )
 
-        # 提取统计信息
-        views_elem = card.find('span', class_=re.compile(r'view', re.I))
-        views = self._extract_number(views_elem) if views_elem else 0
+    def _build_strategy(self, href: str, title: str, author: Optional[str], description: Optional[str],
+                        views_text: Optional[str], likes_text: Optional[str]) -> Optional[Dict]:
+        """由卡片中提取的字段组装策略"""
+        url = self.BASE_URL + href
 
-        likes_elem = card.find('span', class_=re.compile(r'like|recommend', re.I))
-        likes = self._extract_number(likes_elem) if likes_elem else 0
+        if not title or 'script' not in url.lower():
+            return None
 
         return {
             'id': self._generate_id(url),
             'title': title,
             'url': url,
-            'author': author,
-            'description': description[:500],
-            'views': views,
-            'likes': likes,
+            'author': author or "Unknown",
+            'description': (description or "")[:500],
+            'views': self._extract_number(views_text),
+            'likes': self._extract_number(likes_text),
             'source': 'tradingview',
             'discovered_at': datetime.now().isoformat(),
         }
 
-    def _extract_number(self, elem) -> int:
-        """从元素提取数字"""
-        if elem:
-            text = elem.get_text(strip=True)
-            match = re.search(r'[\d,]+', text)
+    def _extract_number(self, text: Optional[str]) -> int:
+        """从文本提取数字"""
+        if text:
+            match = _NUM_RE.search(text)
             if match:
                 return int(match.group().replace(',', ''))
         return 0
 
     def _generate_id(self, url: str) -> str:
         """从URL生成ID"""
-        match = re.search(r'/([a-zA-Z0-9-]+)/$', url)
+        match = _ID_RE.search(url)
         if match:
             return f"tv_{match.group(1)}"
-        return f"tv_{hash(url) % 100000}"
+        # 进程无关、可复现的 64 位哈希
+        return f"tv_{xxhash.xxh64_hexdigest(url.encode())}"
 
     def fetch_script_details(self, url: str) -> Optional[Dict]:
         """获取单个策略的详细信息"""
         try:
+            self._throttle()
             logger.info(f"获取策略详情: {url}")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if HTMLParser is not None:
+                tree = HTMLParser(response.text)
 
-            # 提取Pinescript代码
-            script_elem = soup.find('script', type='text/pine-script') or \
-                         soup.find('code', class_='pinescript')
+                # 提取Pinescript代码
+                script_elem = tree.css_first('script[type="text/pine-script"]') or \
+                             tree.css_first('code.pinescript')
+                pinescript = script_elem.text(strip=True) if script_elem else ""
 
-            pinescript = ""
-            if script_elem:
-                pinescript = script_elem.get_text(strip=True)
+                # 提取完整描述
+                desc_elem = tree.css_first('div[class*="description" i], div[class*="about" i]')
+                description = desc_elem.text(strip=True) if desc_elem else ""
+            else:
+                soup = BeautifulSoup(response.text, 'html.parser')
 
-            # 提取完整描述
-            desc_elem = soup.find('div', class_=re.compile(r'description|about', re.I))
-            description = desc_elem.get_text(strip=True) if desc_elem else ""
+                script_elem = soup.find('script', type='text/pine-script') or \
+                             soup.find('code', class_='pinescript')
+                pinescript = script_elem.get_text(strip=True) if script_elem else ""
+
+                desc_elem = soup.find('div', class_=_DETAIL_DESC_RE)
+                description = desc_elem.get_text(strip=True) if desc_elem else ""
 
             return {
                 'pinescript_code': pinescript,
@@ -182,22 +257,32 @@ class TradingViewScraper:
             logger.error(f"获取策略详情失败: {url}, {e}")
             return None
 
+    def fetch_scripts_details(self, urls: List[str]) -> List[Optional[Dict]]:
+        """并发获取多个策略的详细信息 (顺序与 urls 一致)"""
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as ex:
+            return list(ex.map(self.fetch_script_details, urls))
+
     def discover(self, max_pages: int = 3) -> List[Dict]:
         """发现新策略"""
         all_strategies = []
 
-        for page in range(1, max_pages + 1):
-            logger.info(f"扫描第 {page}/{max_pages} 页...")
+        # 各页并发请求 (共用 session 连接池，受 _throttle 限速)
+        logger.info(f"扫描 {max_pages} 页...")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_WORKERS, max_pages))) as ex:
+            pages = list(ex.map(self.fetch_scripts_page, range(1, max_pages + 1)))
 
-            html = self.fetch_scripts_page(page)
+        for html in pages:
+            # 与逐页抓取一致: 遇到失败页即停止
             if not html:
                 break
 
             strategies = self.parse_scripts_page(html)
             all_strategies.extend(strategies)
 
-            # 礼貌性延迟
-            time.sleep(1)
+        # 翻页期间有新策略发布时同一策略会出现在相邻两页，按URL去重 (集合中只存 8 字节哈希)
+        seen = set()
+        all_strategies = [s for s in all_strategies
+                          if (h := xxhash.xxh64_intdigest(s['url'].encode())) not in seen and not seen.add(h)]
 
         logger.info(f"发现 {len(all_strategies)} 个策略")
         return all_strategies
@@ -10,22 +10,49 @@ from pathlib import Path
 import sys
 import json
 import logging
-import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from typing import List, Dict, Optional
 from dataclasses import dataclass
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from playwright.sync_api import sync_playwright
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import httpx
+except ImportError:  # httpx 不可用时 Nitter 直接使用 Playwright
+    httpx = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:  # selectolax < 1.0 的 Modest 后端
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.resolve()))
 
+from _filters import WEB_RT_PREFIXES, WEB_SPAM_RE, find_keyword, flag_spam, is_retweet, is_spam, lower_keywords
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger('x_playwright_scraper')
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TweetItem:
     """推文数据"""
     author: str
@@ -35,6 +62,9 @@ class TweetItem:
     published_at: str
     source: str = "playwright"
 
+# 已解析的账号配置 {路径: (mtime_ns, accounts)}
+_ACCOUNT_CACHE = {}
+
 # Nitter 实例列表（按优先级）
 NITTER_INSTANCES = [
     "nitter.net",
@@ -44,21 +74,123 @@ NITTER_INSTANCES = [
     "nitter.tedomum.net",
 ]
 
+# 不参与内容提取的静态资源 (图片/字体/媒体，含 Nitter 的 /pic/ /video/ 代理)，由浏览器直接拦截不下载
+# 用 CDP Network.setBlockedURLs 而非 context.route: 注册任何 route 都会关闭整个上下文的 HTTP 缓存，
+# 池中页面复用时页面/样式/脚本便无法命中缓存
+# (样式表保留: inner_text 依赖样式判断元素是否可见)
+_BLOCKED_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico',
+                       'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp4', 'webm', 'm3u8', 'mp3')
+BLOCKED_URL_PATTERNS = ['*://*/pic/*', '*://*/video/*'] + [
+    p for ext in _BLOCKED_EXTENSIONS for p in (f'*.{ext}', f'*.{ext}?*')
+]
+
+# 推文元素选择器，按优先级依次尝试 (Nitter 经典 / 通用 / 包含 tweet 的元素 / HTML5 article)
+TWEET_SELECTORS = ('.timeline-item', '.tweet', '[class*="tweet"]', 'article')
+# 推文元素出现即视为页面可提取
+TIMELINE_SELECTOR = ', '.join(TWEET_SELECTORS)
+# 推文内各字段
+CONTENT_SELECTOR = '.tweet-content, .tweet-text, [class*="content"]'
+DATE_SELECTOR = '.tweet-date, [class*="date"], time'
+LINK_SELECTOR = 'a.tweet-link, [href*="/status/"]'
+
+# 页面内一次完成选择器回退与字段提取 (只取最新10条)，避免每条推文多次往返浏览器
+EXTRACT_JS = """([tweetSelectors, contentSel, dateSel, linkSel]) => {
+    let selector = null;
+    let elements = [];
+    for (const sel of tweetSelectors) {
+        elements = document.querySelectorAll(sel);
+        if (elements.length) {
+            selector = sel;
+            break;
+        }
+    }
+    const tweets = Array.from(elements).slice(0, 10).map(e => {
+        const c = e.querySelector(contentSel);
+        const t = e.querySelector(dateSel);
+        const a = e.querySelector(linkSel);
+        return {
+            content: (c || e).innerText,
+            time: t ? (t.getAttribute('title') || t.innerText) : null,
+            link: a ? a.getAttribute('href') : '',
+        };
+    });
+    return {selector, count: elements.length, tweets};
+}"""
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Cloudflare 等人机验证返回的状态码，需用真实浏览器重试
+CHALLENGE_STATUS = (403, 503)
+
+
+@lru_cache(maxsize=1)
+def _healthy_instance() -> str:
+    """按优先级探测 Nitter 实例，返回第一个可用的 (每轮扫描探测一次)"""
+    for instance in NITTER_INSTANCES:
+        try:
+            response = requests.head(f"https://{instance}/", timeout=2, allow_redirects=True)
+            if response.status_code < 400:
+                return instance
+            logger.warning(f"Nitter 实例不可用: {instance} (状态码: {response.status_code})")
+        except Exception as e:
+            logger.warning(f"Nitter 实例不可用: {instance} - {e}")
+    return NITTER_INSTANCES[0]
+
+
+def _nitter_base() -> str:
+    """当前使用的 Nitter 实例地址，推文链接与回退链接都以它为前缀"""
+    return f"https://{_healthy_instance()}"
+
+
+def _new_http_client():
+    """各线程共用的 HTTP 客户端 (连接池，安装 h2 时启用 HTTP/2)"""
+    kwargs = dict(
+        headers={'User-Agent': USER_AGENT},
+        timeout=15,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=16),
+    )
+    try:
+        return httpx.Client(http2=True, **kwargs)
+    except ImportError:  # 未安装 h2
+        return httpx.Client(**kwargs)
+
 class XPlaywrightScraper:
     """X/Twitter Playwright 抓取器"""
     
+    # 并发扫描的线程数 (每个线程各启动一个浏览器)
+    MAX_WORKERS = 3
+    
     def __init__(self, config_file: str = None):
         self.config_file = config_file or Path(__file__).parent / 'monitored_accounts.json'
         self.accounts = self._load_accounts()
-        self.browser = None
-        self.context = None
+        # 同步版 Playwright 对象只能在创建它的线程中使用，浏览器/上下文按线程各自持有
+        self._local = threading.local()
+        # Nitter HTTP 客户端随每轮 scan_all 创建并关闭，不在实例上长期持有连接
+        self._client = None
+        # requests 备用方案共用连接池，跨账号保持长连接；连接失败自动重试
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                                   max_retries=Retry(total=2, backoff_factor=0.3)))
+        self.session.headers['User-Agent'] = USER_AGENT
     
     def _load_accounts(self) -> List[Dict]:
         """加载监控账号配置"""
         try:
-            with open(self.config_file, 'r') as f:
-                data = json.load(f)
-                return data.get('accounts', [])
+            # 配置未修改时复用上次解析结果
+            key = str(self.config_file)
+            mtime = os.stat(key).st_mtime_ns
+            cached = _ACCOUNT_CACHE.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(key, 'rb') as f:
+                data = _json_loads(f.read())
+            accounts = data.get('accounts', [])
+            # 关键词加载时统一转小写，匹配时不再逐条转换
+            for account in accounts:
+                account['_kw_lower'] = lower_keywords(account.get('strategy_keywords', []))
+            _ACCOUNT_CACHE[key] = (mtime, accounts)
+            return accounts
         except FileNotFoundError:
             logger.warning(f"配置文件不存在: {self.config_file}")
             return []
@@ -68,13 +200,12 @@ class XPlaywrightScraper:
     
     def _get_nitter_url(self, username: str) -> str:
         """获取 Nitter URL"""
-        # 使用第一个可用的 Nitter 实例
-        instance = NITTER_INSTANCES[0]
-        return f"https://{instance}/{username}"
+        # 使用探测到的第一个可用 Nitter 实例
+        return f"{_nitter_base()}/{username}"
     
     def _init_browser(self):
         """初始化浏览器"""
-        if self.browser:
+        if getattr(self._local, 'browser', None):
             return
         
         logger.info("🚀 启动 Playwright 浏览器...")
@@ -82,7 +213,7 @@ class XPlaywrightScraper:
         playwright = sync_playwright().start()
         
         # 启动无头浏览器
-        self.browser = playwright.chromium.launch(
+        browser = playwright.chromium.launch(
             headless=True,
             args=[
                 '--no-sandbox',
@@ -95,84 +226,93 @@ class XPlaywrightScraper:
         )
         
         # 创建浏览器上下文
-        self.context = self.browser.new_context(
+        context = browser.new_context(
             viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            user_agent=USER_AGENT,
             locale='en-US',
         )
         
-        self.playwright = playwright
+        self._local.playwright = playwright
+        self._local.browser = browser
+        self._local.context = context
+        self._local.pages = []  # 空闲页面池，跨账号复用
         logger.info("✅ Playwright 浏览器已启动")
     
     def _close_browser(self):
         """关闭浏览器"""
-        if self.browser:
-            self.browser.close()
-            self.playwright.stop()
-            self.browser = None
-            self.context = None
+        browser = getattr(self._local, 'browser', None)
+        if browser:
+            browser.close()
+            self._local.playwright.stop()
+            self._local.browser = None
+            self._local.context = None
+            self._local.pages = []
             logger.info("🔒 Playwright 浏览器已关闭")
     
+    def _acquire_page(self):
+        """取一个空闲页面，池为空时新建"""
+        if self._local.pages:
+            return self._local.pages.pop()
+        page = self._local.context.new_page()
+        self._block_static_assets(page)
+        return page
+    
+    def _block_static_assets(self, page):
+        """在浏览器网络层拦截静态资源 (不经 Python，不影响 HTTP 缓存)"""
+        try:
+            cdp = self._local.context.new_cdp_session(page)
+            cdp.send('Network.enable')
+            cdp.send('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:  # 拦截失败只影响加载速度
+            logger.warning(f"静态资源拦截设置失败: {e}")
+    
+    def _release_page(self, page):
+        """页面回到空白页后放回池中，已失效的页面直接关闭丢弃"""
+        try:
+            page.goto('about:blank')
+        except Exception:
+            try:
+                page.close()
+            except Exception:
+                pass
+            return
+        self._local.pages.append(page)
+    
     def _check_page_loaded(self, page) -> bool:
         """检查页面是否加载完成"""
         try:
-            # 等待页面完全加载
-            page.wait_for_load_state('networkidle', timeout=10000)
+            # 等到推文元素出现即可，不等网络空闲；无内容时尽快失败
+            page.wait_for_selector(TIMELINE_SELECTOR, timeout=8000)
             return True
         except Exception as e:
             logger.warning(f"页面加载超时: {e}")
             return False
     
     def _extract_tweets_from_nitter(self, page) -> List[Dict]:
-        """从 Nitter 页面提取推文"""
+        """从 Nitter 页面提取推文 (在页面内一次取回全部字段)"""
         tweets = []
         
         try:
-            # 使用多种选择器尝试提取推文
-            selectors = [
-                '.timeline-item',  # Nitter 经典选择器
-                '.tweet',          # 通用选择器
-                '[class*="tweet"]',  # 包含 tweet 的元素
-                'article',         # HTML5 article
-            ]
-            
-            tweet_elements = []
-            for selector in selectors:
-                elements = page.query_selector_all(selector)
-                if elements:
-                    tweet_elements = elements
-                    logger.info(f"使用选择器 '{selector}' 找到 {len(elements)} 个推文元素")
-                    break
+            found = page.evaluate(EXTRACT_JS, [list(TWEET_SELECTORS), CONTENT_SELECTOR, DATE_SELECTOR, LINK_SELECTOR])
+            if found['selector']:
+                logger.info(f"使用选择器 '{found['selector']}' 找到 {found['count']} 个推文元素")
             
-            for element in tweet_elements[:10]:  # 只取最新10条
-                try:
-                    # 提取推文内容
-                    content_elem = element.query_selector('.tweet-content, .tweet-text, [class*="content"]')
-                    content = content_elem.inner_text() if content_elem else element.inner_text()
-                    
-                    # 提取时间
-                    time_elem = element.query_selector('.tweet-date, [class*="date"], time')
-                    time_str = time_elem.get_attribute('title') or time_elem.inner_text() if time_elem else datetime.now().isoformat()
-                    
-                    # 提取链接
-                    link_elem = element.query_selector('a.tweet-link, [href*="/status/"]')
-                    link = link_elem.get_attribute('href') if link_elem else ''
-                    if link and not link.startswith('http'):
-                        link = f"https://nitter.net{link}"
-                    
-                    # 清理内容
-                    content = content.strip()[:500] if content else ''
-                    
-                    if content and len(content) > 10:
-                        tweets.append({
-                            'content': content,
-                            'time': time_str,
-                            'link': link or 'https://nitter.net/unknown',
-                        })
-                        
-                except Exception as e:
-                    logger.debug(f"提取单个推文失败: {e}")
-                    continue
+            for raw in found['tweets']:
+                time_str = raw['time'] or datetime.now().isoformat()
+                
+                link = raw['link'] or ''
+                if link and not link.startswith('http'):
+                    link = f"{_nitter_base()}{link}"
+                
+                # 清理内容
+                content = raw['content'].strip()[:500] if raw['content'] else ''
+                
+                if content and len(content) > 10:
+                    tweets.append({
+                        'content': content,
+                        'time': time_str,
+                        'link': link or f'{_nitter_base()}/unknown',
+                    })
             
         except Exception as e:
             logger.error(f"提取推文失败: {e}")
@@ -181,54 +321,131 @@ class XPlaywrightScraper:
     
     def _is_spam_or_promotion(self, content: str) -> bool:
         """检测是否为垃圾广告或推广内容"""
-        spam_patterns = [
-            r'(?:DM|dm|私信).*?(?:获取|get|领取)',
-            r'(?:免费|free).*?(?:赠送|领取|加微信)',
-            r'(?:掃碼|扫码|点击链接)',
-            r'(?:代币|token).*?(?:发行|launch|发射)',
-            r'(?:空投|airdrop).*?(?:领取|claim)',
-            r'https?://t\.co/\S+',  # 短链接
-            r'(?:加微信|wechat|微信)',
-            r'(?:邀请码|referral).*?(?:免费|free)',
-        ]
-        
-        for pattern in spam_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
-        
-        return False
+        return is_spam(content, WEB_SPAM_RE)
     
     def _is_retweet(self, content: str) -> bool:
         """检测是否为转发内容"""
-        rt_patterns = [
-            r'^RT @',
-            r'^转发自',
-            r'^⚠️.*?转发',
-            r'^MT @',
-        ]
-        
-        for pattern in rt_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
-        
-        return False
+        return is_retweet(content, WEB_RT_PREFIXES, anchored=True)
     
     def _extract_strategy_content(self, content: str, keywords: List[str]) -> Optional[str]:
-        """从推文内容中提取策略相关信息"""
+        """从推文内容中提取策略相关信息 (keywords 需已转小写)"""
         if not keywords:
             return content[:200] if content else None
         
-        content_lower = content.lower()
-        keywords_lower = [k.lower() for k in keywords]
+        # 找到关键词，返回包含关键词的上下文
+        idx = find_keyword(content.lower(), tuple(keywords))
+        if idx < 0:
+            return None
+        
+        start = max(0, idx - 50)
+        end = min(len(content), idx + 100)
+        return content[start:end].strip()
+    
+    def _build_tweets(self, username: str, raw_tweets: List[Dict], strategy_keywords: List[str] = None) -> List[TweetItem]:
+        """过滤转发/广告/无关内容，生成推文列表"""
+        tweets = []
+        contents = [raw.get('content', '') for raw in raw_tweets]
+        # 整批一次扫描标出垃圾广告
+        spam_flags = flag_spam(WEB_SPAM_RE, contents)
+        
+        for raw, content, is_spam in zip(raw_tweets, contents, spam_flags):
+            # 跳过转发
+            if self._is_retweet(content):
+                continue
+            
+            # 跳过垃圾广告
+            if is_spam:
+                continue
+            
+            # 提取策略内容
+            if strategy_keywords:
+                strategy_content = self._extract_strategy_content(content, strategy_keywords)
+                if not strategy_content:
+                    continue
+            else:
+                strategy_content = content[:200]
+            
+            tweet = TweetItem(
+                author=username,
+                url=raw.get('link', f'{_nitter_base()}/{username}'),
+                title=content[:100],
+                content=content,
+                published_at=raw.get('time', datetime.now().isoformat()),
+                source="playwright"
+            )
+            
+            tweets.append(tweet)
+            logger.info(f"📰 提取推文: {content[:50]}...")
+        
+        return tweets
+    
+    def _parse_nitter_html(self, html: str) -> Optional[List[Dict]]:
+        """从 Nitter 服务端渲染的 HTML 提取推文 (选择器与 Playwright 提取一致)
+        页面中没有任何推文元素 (人机验证/中间页) 时返回 None
+        """
+        tree = HTMLParser(html)
+        
+        tweet_nodes = []
+        for selector in TWEET_SELECTORS:
+            tweet_nodes = tree.css(selector)
+            if tweet_nodes:
+                break
+        if not tweet_nodes:
+            return None
         
-        for keyword in keywords_lower:
-            if keyword in content_lower:
-                idx = content_lower.find(keyword)
-                start = max(0, idx - 50)
-                end = min(len(content), idx + 100)
-                return content[start:end].strip()
+        tweets = []
+        for node in tweet_nodes[:10]:  # 只取最新10条
+            content_node = node.css_first(CONTENT_SELECTOR) or node
+            # <br> 换成换行，与 inner_text 一致 (separator 会把行内链接也拆开，不用)
+            for br in content_node.css('br'):
+                br.replace_with('\n')
+            content = content_node.text()
+            
+            time_node = node.css_first(DATE_SELECTOR)
+            time_str = (time_node.attributes.get('title') or time_node.text(strip=True)) if time_node else datetime.now().isoformat()
+            
+            link_node = node.css_first(LINK_SELECTOR)
+            link = link_node.attributes.get('href') if link_node else ''
+            if link and not link.startswith('http'):
+                link = f"{_nitter_base()}{link}"
+            
+            content = content.strip()[:500] if content else ''
+            if content and len(content) > 10:
+                tweets.append({
+                    'content': content,
+                    'time': time_str,
+                    'link': link or f'{_nitter_base()}/unknown',
+                })
         
-        return None
+        return tweets
+    
+    def fetch_tweets_via_http(self, username: str, strategy_keywords: List[str] = None) -> Optional[List[TweetItem]]:
+        """直接请求 Nitter HTML 并解析 (无需浏览器)，返回 None 表示需要 Playwright"""
+        if self._client is None:
+            return None
+        
+        nitter_url = self._get_nitter_url(username)
+        logger.info(f"🌐 请求 Nitter: {nitter_url}")
+        
+        try:
+            response = self._client.get(nitter_url)
+        except Exception as e:
+            logger.warning(f"Nitter 请求失败: {username} - {e}")
+            return None
+        
+        if response.status_code in CHALLENGE_STATUS:
+            logger.info(f"🛡️ 遇到人机验证 ({response.status_code})，改用 Playwright: {username}")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"Nitter 请求失败: {username} (状态码: {response.status_code})")
+            return []
+        
+        raw_tweets = self._parse_nitter_html(response.text)
+        if raw_tweets is None:
+            # 以 200 返回的验证页/中间页: 与 Playwright 的 TIMELINE_SELECTOR 判断一致，交给浏览器重试
+            logger.info(f"🛡️ 页面无推文元素，改用 Playwright: {username}")
+            return None
+        return self._build_tweets(username, raw_tweets, strategy_keywords)
     
     def fetch_tweets_via_nitter(self, username: str, strategy_keywords: List[str] = None) -> List[TweetItem]:
         """通过 Nitter 获取推文"""
@@ -237,12 +454,13 @@ class XPlaywrightScraper:
         
         logger.info(f"🌐 访问 Nitter: {nitter_url}")
         
+        page = None
         try:
             self._init_browser()
-            page = self.context.new_page()
+            page = self._acquire_page()
             
             # 模拟真实访问
-            page.goto(nitter_url, wait_until='networkidle')
+            page.goto(nitter_url, wait_until='domcontentloaded')
             
             # 等待页面加载
             if not self._check_page_loaded(page):
@@ -256,41 +474,13 @@ class XPlaywrightScraper:
             # 提取推文
             raw_tweets = self._extract_tweets_from_nitter(page)
             
-            for raw in raw_tweets:
-                content = raw.get('content', '')
-                
-                # 跳过转发
-                if self._is_retweet(content):
-                    continue
-                
-                # 跳过垃圾广告
-                if self._is_spam_or_promotion(content):
-                    continue
-                
-                # 提取策略内容
-                if strategy_keywords:
-                    strategy_content = self._extract_strategy_content(content, strategy_keywords)
-                    if not strategy_content:
-                        continue
-                else:
-                    strategy_content = content[:200]
-                
-                tweet = TweetItem(
-                    author=username,
-                    url=raw.get('link', f'https://nitter.net/{username}'),
-                    title=content[:100],
-                    content=content,
-                    published_at=raw.get('time', datetime.now().isoformat()),
-                    source="playwright"
-                )
-                
-                tweets.append(tweet)
-                logger.info(f"📰 提取推文: {content[:50]}...")
-            
-            page.close()
+            tweets = self._build_tweets(username, raw_tweets, strategy_keywords)
             
         except Exception as e:
             logger.error(f"❌ Nitter 抓取失败: {username} - {e}")
+        finally:
+            if page is not None:
+                self._release_page(page)
         
         return tweets
     
@@ -299,28 +489,29 @@ class XPlaywrightScraper:
         logger.info(f"🌐 使用 requests 备用方案: @{username}")
         
         try:
-            import requests
-            from bs4 import BeautifulSoup
-            
             nitter_url = self._get_nitter_url(username)
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(nitter_url, headers=headers, timeout=15)
+            response = self.session.get(nitter_url, timeout=15)
             
             if response.status_code != 200:
                 logger.warning(f"请求失败: {response.status_code}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            tweet_elements = soup.select('.timeline-item, .tweet')[:10]
+            if HTMLParser is not None:
+                tweet_elements = HTMLParser(response.text).css('.timeline-item, .tweet')[:10]
+            else:
+                from bs4 import BeautifulSoup
+                soup = BeautifulSoup(response.text, 'html.parser')
+                tweet_elements = soup.select('.timeline-item, .tweet')[:10]
             
             tweets = []
             for elem in tweet_elements:
                 try:
-                    content_elem = elem.select_one('.tweet-content, .tweet-text')
-                    content = content_elem.get_text(strip=True) if content_elem else ''
+                    if HTMLParser is not None:
+                        content_elem = elem.css_first('.tweet-content, .tweet-text')
+                        content = content_elem.text(strip=True) if content_elem else ''
+                    else:
+                        content_elem = elem.select_one('.tweet-content, .tweet-text')
+                        content = content_elem.get_text(strip=True) if content_elem else ''
                     
                     if content and not self._is_retweet(content) and not self._is_spam_or_promotion(content):
                         if strategy_keywords:
@@ -332,7 +523,7 @@ class XPlaywrightScraper:
                         
                         tweets.append(TweetItem(
                             author=username,
-                            url=f"https://nitter.net/{username}",
+                            url=f"{_nitter_base()}/{username}",
                             title=content[:100],
                             content=content,
                             published_at=datetime.now().isoformat(),
@@ -344,7 +535,7 @@ class XPlaywrightScraper:
             return tweets
             
         except ImportError:
-            logger.warning("BeautifulSoup 不可用，跳过备用方案")
+            logger.warning("selectolax 与 BeautifulSoup 均不可用，跳过备用方案")
             return []
         except Exception as e:
             logger.error(f"备用方案失败: {e}")
@@ -362,13 +553,20 @@ class XPlaywrightScraper:
         logger.info(f"🔍 Playwright 扫描账号: @{username}")
         logger.info(f"📊 策略关键词: {strategy_keywords}")
         
-        # 优先使用 Nitter（通过 Playwright）
-        tweets = self.fetch_tweets_via_nitter(username, strategy_keywords)
+        # 加载配置时已转小写；账号非经 _load_accounts 加载时现算
+        kw_lower = account.get('_kw_lower')
+        if kw_lower is None:
+            kw_lower = lower_keywords(strategy_keywords)
+        
+        # 优先直接请求 Nitter HTML，遇到人机验证再用 Playwright
+        tweets = self.fetch_tweets_via_http(username, kw_lower)
+        if tweets is None:
+            tweets = self.fetch_tweets_via_nitter(username, kw_lower)
         
         if not tweets:
             # 备用：使用 requests
             logger.info("🔄 尝试备用方案...")
-            tweets = self.fetch_tweets_via_web(username, strategy_keywords)
+            tweets = self.fetch_tweets_via_web(username, kw_lower)
         
         logger.info(f"✅ 获取 {len(tweets)} 条策略相关推文")
         return tweets
@@ -376,23 +574,56 @@ class XPlaywrightScraper:
     def scan_all(self) -> Dict[str, List[TweetItem]]:
         """扫描所有配置账号（只扫描配置为 Playwright 的账号）"""
         results = {}
+        todo = queue.Queue()
+        pw_accounts = []
+        
+        for account in self.accounts:
+            source = account.get('source', 'playwright')
+            
+            if source != 'playwright':
+                logger.info(f"⏭️ 跳过非 Playwright 账号: @{account.get('username')} (使用 {source})")
+                continue
+            
+            todo.put((len(pw_accounts), account))
+            pw_accounts.append(account)
+        
+        if not pw_accounts:
+            return results
+        
+        # 每轮扫描重新探测一次实例，在启动工作线程前完成
+        _healthy_instance.cache_clear()
+        logger.info(f"使用 Nitter 实例: {_healthy_instance()}")
         
+        scanned = [None] * len(pw_accounts)
+        if httpx and HTMLParser:
+            self._client = _new_http_client()
+        
+        def worker():
+            # 每个线程用自己的浏览器依次处理队列中的账号，结束时在本线程内关闭
+            try:
+                while True:
+                    try:
+                        i, account = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    scanned[i] = self.scan_account(account)
+            finally:
+                self._close_browser()
+        
+        n_workers = min(self.MAX_WORKERS, len(pw_accounts))
         try:
-            for account in self.accounts:
-                source = account.get('source', 'playwright')
-                
-                if source != 'playwright':
-                    logger.info(f"⏭️ 跳过非 Playwright 账号: @{account.get('username')} (使用 {source})")
-                    continue
-                
-                username = account.get('username')
-                tweets = self.scan_account(account)
-                
-                if tweets:
-                    results[username] = tweets
-                
+            with ThreadPoolExecutor(max_workers=n_workers) as ex:
+                futures = [ex.submit(worker) for _ in range(n_workers)]
         finally:
-            self._close_browser()
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        for f in futures:
+            f.result()
+        
+        for account, tweets in zip(pw_accounts, scanned):
+            if tweets:
+                results[account.get('username')] = tweets
         
         return results
 
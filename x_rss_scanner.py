@@ -9,25 +9,54 @@ import os
 from pathlib import Path
 import sys
 import json
+import hashlib
 import logging
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import feedparser
-import re
 from datetime import datetime
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 
+try:
+    from lxml import etree
+except ImportError:  # lxml 不可用时回退到 feedparser
+    etree = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import httpx
+except ImportError:  # httpx 不可用时用线程池并发请求
+    httpx = None
+
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:  # pybloom_live 不可用时不做跨次去重
+    ScalableBloomFilter = None
+
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.resolve()))
 
+from _filters import RT_PREFIXES, SPAM_RE, find_keyword, flag_spam, is_retweet, is_spam, lower_keywords
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger('x_rss_scanner')
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TweetItem:
     """推文数据"""
     author: str
@@ -44,19 +73,89 @@ RSS_SERVICES = [
     "https://rss.app/feeds/v1.2/{username}.xml",
 ]
 
+# 已解析的账号配置 {路径: (mtime_ns, accounts)}
+_ACCOUNT_CACHE = {}
+
+# 各账号上次抓取的 ETag / Last-Modified，用于条件请求
+HTTP_CACHE_FILE = Path(__file__).parent / '.rss_cache.json'
+
+# 已处理推文的布隆过滤器，跨次扫描去重
+SEEN_FILE = Path(__file__).parent / '.seen.bloom'
+
+# 每个账号只处理最新10条
+MAX_ENTRIES = 10
+
+
+def _parse_feed(data: bytes) -> feedparser.FeedParserDict:
+    """解析订阅内容: RSS 用 lxml 流式读取前 MAX_ENTRIES 个 <item>，其他格式 (如 Atom) 交给 feedparser"""
+    if etree is not None:
+        entries = []
+        try:
+            # 不解析外部实体、不联网
+            for _, item in etree.iterparse(BytesIO(data), tag='item', resolve_entities=False, no_network=True):
+                entry = {
+                    'title': item.findtext('title'),
+                    'link': item.findtext('link'),
+                    'summary': item.findtext('description'),
+                    'published': item.findtext('pubDate'),
+                }
+                entries.append({k: v for k, v in entry.items() if v is not None})
+                item.clear()
+                if len(entries) >= MAX_ENTRIES:
+                    break
+        except etree.XMLSyntaxError:
+            entries = []
+        if entries:
+            return feedparser.FeedParserDict(entries=entries, bozo=0)
+    
+    return feedparser.parse(data)
+
+def _new_async_client(max_connections: int):
+    """各账号共用的异步 HTTP 客户端 (安装 h2 时同一主机的请求复用一条连接)"""
+    limits = httpx.Limits(max_connections=max_connections)
+    try:
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=2)
+    except ImportError:  # 未安装 h2
+        transport = httpx.AsyncHTTPTransport(limits=limits, retries=2)
+    return httpx.AsyncClient(transport=transport, timeout=10, follow_redirects=True)
+
 class XRSSScanner:
     """X/Twitter RSS 扫描器"""
     
+    # 各账号并发扫描的线程数 (网络 I/O 为主)
+    MAX_WORKERS = 8
+    
     def __init__(self, config_file: str = None):
         self.config_file = config_file or Path(__file__).parent / 'monitored_accounts.json'
         self.accounts = self._load_accounts()
+        self.http_cache = self._load_http_cache()
+        self._cache_lock = threading.Lock()
+        self._seen = self._load_seen()
+        self._seen_lock = threading.Lock()
+        # 本轮扫描处理完的推文键，scan_all 成功结束后才并入集合并保存
+        self._pending_seen = []
+        # 各账号共用连接池，跨账号保持长连接；连接失败自动重试
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                                                   max_retries=Retry(total=2, backoff_factor=0.3)))
         
     def _load_accounts(self) -> List[Dict]:
         """加载监控账号配置"""
         try:
-            with open(self.config_file, 'r') as f:
-                data = json.load(f)
-                return data.get('accounts', [])
+            # 配置未修改时复用上次解析结果
+            key = str(self.config_file)
+            mtime = os.stat(key).st_mtime_ns
+            cached = _ACCOUNT_CACHE.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(key, 'rb') as f:
+                data = _json_loads(f.read())
+            accounts = data.get('accounts', [])
+            # 关键词加载时统一转小写，匹配时不再逐条转换
+            for account in accounts:
+                account['_kw_lower'] = lower_keywords(account.get('strategy_keywords', []))
+            _ACCOUNT_CACHE[key] = (mtime, accounts)
+            return accounts
         except FileNotFoundError:
             logger.warning(f"配置文件不存在: {self.config_file}")
             return []
@@ -64,6 +163,75 @@ class XRSSScanner:
             logger.error(f"加载配置失败: {e}")
             return []
     
+    def _load_http_cache(self) -> Dict[str, Dict]:
+        """加载条件请求缓存 {username: {etag, modified}}"""
+        try:
+            with open(HTTP_CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"加载 RSS 缓存失败: {e}")
+            return {}
+    
+    def _save_http_cache(self):
+        """保存条件请求缓存"""
+        try:
+            with open(HTTP_CACHE_FILE, 'w') as f:
+                json.dump(self.http_cache, f, indent=2)
+        except Exception as e:
+            logger.warning(f"保存 RSS 缓存失败: {e}")
+    
+    def _load_seen(self):
+        """加载已处理推文集合，文件不存在时新建"""
+        if ScalableBloomFilter is None:
+            return None
+        try:
+            with open(SEEN_FILE, 'rb') as f:
+                return ScalableBloomFilter.fromfile(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"加载已处理推文集合失败: {e}")
+        return ScalableBloomFilter(initial_capacity=10_000, error_rate=1e-4)
+    
+    def _save_seen(self):
+        """保存已处理推文集合"""
+        if self._seen is None:
+            return
+        try:
+            with open(SEEN_FILE, 'wb') as f:
+                self._seen.tofile(f)
+        except Exception as e:
+            logger.warning(f"保存已处理推文集合失败: {e}")
+    
+    def _drop_seen(self, username: str, keywords, entries: list, contents: List[str]):
+        """去掉该账号之前扫描已处理过的推文，返回其余推文及其键 (此时不记入集合)
+        过滤结果取决于账号及其关键词，键包含二者: 同一内容在不同账号下各自判断，修改关键词后重新过滤
+        """
+        if self._seen is None:
+            return entries, contents, []
+        scope = '\n'.join((username, '\x1f'.join(keywords or ()), ''))
+        kept_entries, kept_contents, keys = [], [], []
+        for entry, content in zip(entries, contents):
+            key = hashlib.blake2b((scope + content).encode(), digest_size=8).hexdigest()
+            if key in self._seen:
+                continue
+            kept_entries.append(entry)
+            kept_contents.append(content)
+            keys.append(key)
+        return kept_entries, kept_contents, keys
+    
+    def _commit_seen(self):
+        """本轮扫描成功结束: 处理完的推文并入集合并保存"""
+        if self._seen is None:
+            return
+        with self._seen_lock:
+            for key in self._pending_seen:
+                self._seen.add(key)
+            self._pending_seen = []
+        self._save_seen()
+    
     def _get_rss_url(self, username: str) -> str:
         """生成 RSS URL"""
         for service in RSS_SERVICES:
@@ -78,104 +246,115 @@ class XRSSScanner:
         rss_url = self._get_rss_url(username)
         
         try:
-            response = requests.get(rss_url, timeout=10)
-            if response.status_code == 200 and 'xml' in response.headers.get('content-type', '').lower():
-                logger.info(f"✅ RSS 可用: {username} -> {rss_url}")
-                return True
-            else:
-                logger.warning(f"❌ RSS 不可用: {username} (状态码: {response.status_code})")
-                return False
+            # HEAD 探测即可，不下载订阅内容；服务端不支持 HEAD 时回退到 GET
+            response = self.session.head(rss_url, allow_redirects=True, timeout=5)
+            if response.status_code == 405:
+                response = self.session.get(rss_url, timeout=10)
+            return self._is_rss_response(username, rss_url, response)
         except Exception as e:
             logger.error(f"❌ RSS 检查失败: {username} - {e}")
             return False
     
+    def _is_rss_response(self, username: str, rss_url: str, response) -> bool:
+        """探测响应是否为可用的 RSS (requests 与 httpx 的响应接口一致)"""
+        if response.status_code == 200 and 'xml' in response.headers.get('content-type', '').lower():
+            logger.info(f"✅ RSS 可用: {username} -> {rss_url}")
+            return True
+        logger.warning(f"❌ RSS 不可用: {username} (状态码: {response.status_code})")
+        return False
+    
     def fetch_feed(self, username: str) -> Optional[feedparser.FeedParserDict]:
         """获取 RSS 订阅源"""
         rss_url = self._get_rss_url(username)
         
         try:
             logger.info(f"获取 RSS 源: {rss_url}")
-            feed = feedparser.parse(rss_url)
-            
-            if feed.bozo:
-                logger.warning(f"RSS 解析警告: {username} - {feed.bozo_exception}")
-            
-            if hasattr(feed, 'entries') and len(feed.entries) > 0:
-                logger.info(f"✅ 成功获取 {len(feed.entries)} 条推文: {username}")
-                return feed
-            
-            logger.warning(f"⚠️ 无推文数据: {username}")
-            return None
+            response = self.session.get(rss_url, headers=self._conditional_headers(username), timeout=10)
+            return self._read_feed(username, response)
             
         except Exception as e:
             logger.error(f"❌ RSS 获取失败: {username} - {e}")
             return None
     
+    def _conditional_headers(self, username: str) -> Dict[str, str]:
+        """带上次的 ETag / Last-Modified 条件请求，未更新时服务端返回 304 且不含内容"""
+        cached = self.http_cache.get(username, {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('modified'):
+            headers['If-Modified-Since'] = cached['modified']
+        return headers
+    
+    def _read_feed(self, username: str, response) -> Optional[feedparser.FeedParserDict]:
+        """处理订阅源响应: 记录条件请求缓存并解析"""
+        if response.status_code == 304:
+            logger.info(f"⏸️ RSS 未更新: {username}")
+            return feedparser.FeedParserDict(status=304, entries=[])
+        
+        if response.status_code != 200:
+            logger.warning(f"⚠️ RSS 请求失败: {username} (状态码: {response.status_code})")
+            return None
+        
+        etag, modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if etag or modified:
+            with self._cache_lock:
+                self.http_cache[username] = {'etag': etag, 'modified': modified}
+                self._save_http_cache()
+        
+        feed = _parse_feed(response.content)
+        
+        if feed.bozo:
+            logger.warning(f"RSS 解析警告: {username} - {feed.bozo_exception}")
+        
+        if hasattr(feed, 'entries') and len(feed.entries) > 0:
+            logger.info(f"✅ 成功获取 {len(feed.entries)} 条推文: {username}")
+            return feed
+        
+        logger.warning(f"⚠️ 无推文数据: {username}")
+        return None
+    
     def _extract_strategy_content(self, content: str, keywords: List[str]) -> Optional[str]:
-        """从推文内容中提取策略相关信息"""
+        """从推文内容中提取策略相关信息 (keywords 需已转小写)"""
         if not keywords:
             return content[:200] if content else None
         
-        # 转换为小写进行匹配
-        content_lower = content.lower()
-        keywords_lower = [k.lower() for k in keywords]
-        
-        # 检查是否包含策略关键词
-        for keyword in keywords_lower:
-            if keyword in content_lower:
-                # 找到关键词，返回包含关键词的上下文
-                idx = content_lower.find(keyword)
-                start = max(0, idx - 50)
-                end = min(len(content), idx + 100)
-                return content[start:end].strip()
+        # 找到关键词，返回包含关键词的上下文
+        idx = find_keyword(content.lower(), tuple(keywords))
+        if idx < 0:
+            return None
         
-        return None
+        start = max(0, idx - 50)
+        end = min(len(content), idx + 100)
+        return content[start:end].strip()
     
     def _is_spam_or_promotion(self, content: str) -> bool:
         """检测是否为垃圾广告或推广内容"""
-        spam_patterns = [
-            r'(?:DM|dm|私信).*?(?:获取|get|领取)',
-            r'(?:免费|free).*?(?:赠送|领取|加微信)',
-            r'(?:掃碼|扫码|点击链接)',
-            r'(?:代币|token).*?(?:发行|launch|发射)',
-            r'(?:空投|airdrop).*?(?:领取|claim)',
-            r'https?://t\.co/\S+',  # 短链接通常是推广
-        ]
-        
-        for pattern in spam_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
-        
-        return False
+        return is_spam(content, SPAM_RE)
     
     def _is_retweet(self, content: str) -> bool:
         """检测是否为转发内容"""
-        rt_patterns = [
-            r'^RT @',
-            r'^转发自',
-            r'⚠️.*?转发',
-        ]
-        
-        for pattern in rt_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                return True
-        
-        return False
+        return is_retweet(content, RT_PREFIXES)
     
     def parse_tweets(self, username: str, feed: feedparser.FeedParserDict, strategy_keywords: List[str] = None) -> List[TweetItem]:
         """解析推文并提取策略内容"""
         tweets = []
+        entries = feed.entries[:MAX_ENTRIES]
         
-        for entry in feed.entries[:10]:  # 只取最新10条
-            # 获取推文内容
-            content = entry.get('summary', '') or entry.get('title', '')
-            
+        # 获取推文内容
+        contents = [entry.get('summary', '') or entry.get('title', '') for entry in entries]
+        # 已处理过的推文不再过滤
+        entries, contents, seen_keys = self._drop_seen(username, strategy_keywords, entries, contents)
+        # 整批一次扫描标出垃圾广告
+        spam_flags = flag_spam(SPAM_RE, contents)
+        
+        for entry, content, is_spam in zip(entries, contents, spam_flags):
             # 跳过转发
             if self._is_retweet(content):
                 continue
             
             # 跳过垃圾广告
-            if self._is_spam_or_promotion(content):
+            if is_spam:
                 continue
             
             # 提取策略内容
@@ -204,19 +383,19 @@ class XRSSScanner:
             tweets.append(tweet)
             logger.info(f"📰 解析推文: {content[:50]}...")
         
+        # 整批处理完才记下，待 scan_all 成功结束后并入集合
+        with self._seen_lock:
+            self._pending_seen.extend(seen_keys)
+        
         return tweets
     
     def scan_account(self, account: Dict) -> List[TweetItem]:
         """扫描单个账号"""
         username = account.get('username')
-        strategy_keywords = account.get('strategy_keywords', [])
-        
         if not username:
             return []
         
-        logger.info(f"\n{'='*50}")
-        logger.info(f"🔍 RSS 扫描账号: @{username}")
-        logger.info(f"📊 策略关键词: {strategy_keywords}")
+        kw_lower = self._start_account(account)
         
         # 检查 RSS 是否可用
         if not self.check_rss_available(username):
@@ -224,19 +403,85 @@ class XRSSScanner:
             return None  # 返回 None 表示需要使用备选方案
         
         # 获取 RSS 源
-        feed = self.fetch_feed(username)
+        return self._tweets_from_feed(username, self.fetch_feed(username), kw_lower)
+    
+    async def _scan_account_async(self, client, account: Dict) -> List[TweetItem]:
+        """scan_account 的异步版本，请求经共享的 httpx 客户端发出"""
+        username = account.get('username')
+        if not username:
+            return []
+        
+        kw_lower = self._start_account(account)
+        
+        if not await self._check_rss_available_async(client, username):
+            logger.warning(f"⚠️ RSS 不可用，返回 None 以便使用 Playwright")
+            return None
+        
+        return self._tweets_from_feed(username, await self._fetch_feed_async(client, username), kw_lower)
+    
+    async def _check_rss_available_async(self, client, username: str) -> bool:
+        """check_rss_available 的异步版本"""
+        rss_url = self._get_rss_url(username)
+        
+        try:
+            response = await client.head(rss_url, timeout=5)
+            if response.status_code == 405:
+                response = await client.get(rss_url)
+            return self._is_rss_response(username, rss_url, response)
+        except Exception as e:
+            logger.error(f"❌ RSS 检查失败: {username} - {e}")
+            return False
+    
+    async def _fetch_feed_async(self, client, username: str) -> Optional[feedparser.FeedParserDict]:
+        """fetch_feed 的异步版本"""
+        rss_url = self._get_rss_url(username)
+        
+        try:
+            logger.info(f"获取 RSS 源: {rss_url}")
+            response = await client.get(rss_url, headers=self._conditional_headers(username))
+            return self._read_feed(username, response)
+        except Exception as e:
+            logger.error(f"❌ RSS 获取失败: {username} - {e}")
+            return None
+    
+    def _start_account(self, account: Dict) -> tuple:
+        """打印账号信息，返回小写关键词"""
+        strategy_keywords = account.get('strategy_keywords', [])
+        
+        logger.info(f"\n{'='*50}")
+        logger.info(f"🔍 RSS 扫描账号: @{account.get('username')}")
+        logger.info(f"📊 策略关键词: {strategy_keywords}")
+        
+        # 加载配置时已转小写；账号非经 _load_accounts 加载时现算
+        kw_lower = account.get('_kw_lower')
+        if kw_lower is None:
+            kw_lower = lower_keywords(strategy_keywords)
+        return kw_lower
+    
+    def _tweets_from_feed(self, username: str, feed, kw_lower: tuple) -> Optional[List[TweetItem]]:
+        """由订阅源得到策略推文，获取失败返回 None"""
         if not feed:
             return None
         
+        # 自上次扫描后无新推文
+        if feed.get('status') == 304:
+            return []
+        
         # 解析推文
-        tweets = self.parse_tweets(username, feed, strategy_keywords)
+        tweets = self.parse_tweets(username, feed, kw_lower)
         logger.info(f"✅ 获取 {len(tweets)} 条策略相关推文")
         
         return tweets
     
+    async def _scan_all_async(self, accounts: List[Dict]) -> list:
+        """各账号请求并发发出；安装 h2 时对同一主机复用一条 HTTP/2 连接多路传输"""
+        async with _new_async_client(self.MAX_WORKERS) as client:
+            return await asyncio.gather(*(self._scan_account_async(client, a) for a in accounts))
+    
     def scan_all(self) -> Dict[str, List[TweetItem]]:
         """扫描所有配置账号（只扫描配置为 RSS 的账号）"""
         results = {}
+        rss_accounts = []
         
         for account in self.accounts:
             source = account.get('source', 'rss')
@@ -245,8 +490,24 @@ class XRSSScanner:
                 logger.info(f"⏭️ 跳过非 RSS 账号: @{account.get('username')} (使用 {source})")
                 continue
             
+            rss_accounts.append(account)
+        
+        if not rss_accounts:
+            return results
+        
+        # 丢弃此前失败的扫描留下的键
+        with self._seen_lock:
+            self._pending_seen = []
+        
+        # 各账号并发请求，结果按配置顺序汇总
+        if httpx is not None:
+            scanned = asyncio.run(self._scan_all_async(rss_accounts))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(rss_accounts))) as ex:
+                scanned = list(ex.map(self.scan_account, rss_accounts))
+        
+        for account, tweets in zip(rss_accounts, scanned):
             username = account.get('username')
-            tweets = self.scan_account(account)
             
             if tweets:
                 results[username] = tweets
@@ -254,6 +515,7 @@ class XRSSScanner:
                 # RSS 不可用，记录但不让它失败
                 results[username] = []
         
+        self._commit_seen()
         return results
 
 def main():